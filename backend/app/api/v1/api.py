@@ -1,7 +1,8 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from .endpoints import health, documents, ai, voice, test_endpoints, database
 
-api_router = APIRouter()
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 # Health endpoints
 api_router.include_router(health.router, prefix="/health", tags=["health"])
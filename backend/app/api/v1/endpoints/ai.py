@@ -1,41 +1,67 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, Any, Optional
 import logging
 from ....services.ai_service import ai_service
 from ....core.auth import get_current_user
+from ....utils.responses import StaticJSONResponse, SSE_HEADERS, sse_event
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 class ChatRequest(BaseModel):
+    # Unknown keys from the frontend are dropped instead of being stored on the model
+    model_config = ConfigDict(extra='ignore')
+
     contact: Dict[str, Any]
     user_message: str
-    chat_history: List[Dict[str, Any]] = []
-    conversation_documents: Optional[List[Dict[str, Any]]] = None
+    # Bare lists: items are passed through to ai_service as-is rather than
+    # validated (and copied) dict by dict; the service only reads them with .get()
+    chat_history: list = Field(default_factory=list)
+    conversation_documents: Optional[list] = None
 
 class SummarizeRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     document_content: str
     filename: str
 
+def validate_chat_request(request: ChatRequest):
+    """
+    Local request checks. These run before the single Gemini call made per
+    turn, so no model round trip is spent on a request that will be rejected.
+    """
+    if not request.contact:
+        raise HTTPException(status_code=400, detail="Contact information is required")
+    
+    if not request.user_message.strip():
+        raise HTTPException(status_code=400, detail="User message cannot be empty")
+
+def wants_event_stream(http_request: Request) -> bool:
+    """True when the client asked for server-sent events via its Accept header"""
+    return "text/event-stream" in http_request.headers.get("accept", "")
+
 @router.post("/generate-response")
 async def generate_ai_response(
     request: ChatRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
     current_user = Depends(get_current_user)
 ):
     """
     Generate AI response using Google Gemini API.
     This endpoint replaces the frontend geminiService for better performance.
+    Clients sending `Accept: text/event-stream` get the streamed response of
+    /generate-response/stream instead, so text arrives as it is generated.
     """
+    if wants_event_stream(http_request):
+        return await stream_ai_response(request, current_user)
+    
     try:
-        logger.info(f"🤖 Generating AI response for user {current_user.id}")
-        
-        # Validate request
-        if not request.contact:
-            raise HTTPException(status_code=400, detail="Contact information is required")
+        logger.info("🤖 Generating AI response for user %s", current_user.id)
         
-        if not request.user_message.strip():
-            raise HTTPException(status_code=400, detail="User message cannot be empty")
+        validate_chat_request(request)
         
         # Generate response
         response = await ai_service.generate_response(
@@ -45,7 +71,7 @@ async def generate_ai_response(
             conversation_documents=request.conversation_documents
         )
         
-        logger.info(f"✅ Successfully generated AI response ({len(response)} characters)")
+        background_tasks.add_task(logger.info, "✅ Successfully generated AI response (%d characters)", len(response))
         
         return {
             "success": True,
@@ -58,24 +84,73 @@ async def generate_ai_response(
             }
         }
         
+    except HTTPException:
+        raise
+    
     except ValueError as e:
-        logger.error(f"❌ AI generation error: {e}")
+        logger.error("❌ AI generation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     
     except Exception as e:
-        logger.error(f"❌ Unexpected error in AI generation: {e}")
+        logger.error("❌ Unexpected error in AI generation: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
+@router.post("/generate-response/stream")
+async def stream_ai_response(
+    request: ChatRequest,
+    current_user = Depends(get_current_user)
+):
+    """
+    Stream the AI response as server-sent events.
+    Emits `data: {"text": ...}` frames as Gemini produces them, then an
+    `event: done` frame with the same metadata as /generate-response, or an
+    `event: error` frame if generation fails part way.
+    """
+    logger.info("🤖 Streaming AI response for user %s", current_user.id)
+    
+    validate_chat_request(request)
+    
+    async def event_stream():
+        response_length = 0
+        try:
+            async for chunk in ai_service.generate_response_stream(
+                contact=request.contact,
+                user_message=request.user_message,
+                chat_history=request.chat_history,
+                conversation_documents=request.conversation_documents
+            ):
+                response_length += len(chunk)
+                yield sse_event({"text": chunk})
+            
+            yield sse_event({
+                "success": True,
+                "metadata": {
+                    "contact_name": request.contact.get('name', 'AI'),
+                    "response_length": response_length,
+                    "processed_documents": len(request.conversation_documents or []),
+                    "history_length": len(request.chat_history)
+                }
+            }, event="done")
+            logger.info("✅ Successfully streamed AI response (%d characters)", response_length)
+            
+        except Exception as e:
+            # Headers are already sent, so the failure is reported in-band
+            logger.error("❌ AI streaming error: %s", e)
+            yield sse_event({"success": False, "detail": str(e)}, event="error")
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/summarize-document")
 async def summarize_document(
     request: SummarizeRequest,
+    background_tasks: BackgroundTasks,
     current_user = Depends(get_current_user)
 ):
     """
     Generate a summary of a document using AI.
     """
     try:
-        logger.info(f"📄 Summarizing document: {request.filename} for user {current_user.id}")
+        logger.info("📄 Summarizing document: %s for user %s", request.filename, current_user.id)
         
         # Validate request
         if not request.document_content.strip():
@@ -90,7 +165,7 @@ async def summarize_document(
             filename=request.filename
         )
         
-        logger.info(f"✅ Generated summary for {request.filename}")
+        background_tasks.add_task(logger.info, "✅ Generated summary for %s", request.filename)
         
         return {
             "success": True,
@@ -102,8 +177,11 @@ async def summarize_document(
             }
         }
         
+    except HTTPException:
+        raise
+    
     except Exception as e:
-        logger.error(f"❌ Error summarizing document: {e}")
+        logger.error("❌ Error summarizing document: %s", e)
         raise HTTPException(status_code=500, detail=f"Summarization error: {str(e)}")
 
 @router.get("/health")
@@ -116,50 +194,48 @@ async def ai_service_health():
         
         return {
             "service": "ai-generation",
-            **health_status
+            **health_status,
+            "gemini": ai_service.concurrency_stats()
         }
         
     except Exception as e:
-        logger.error(f"❌ AI service health check failed: {e}")
+        logger.error("❌ AI service health check failed: %s", e)
         return {
             "service": "ai-generation",
             "status": "unhealthy",
             "error": str(e)
         }
 
+_AVAILABLE_MODELS = StaticJSONResponse({
+    "models": [
+        {
+            "name": "gemini-1.5-flash",
+            "description": "Fast and efficient model for most tasks",
+            "max_tokens": 2048,
+            "supported_features": ["text_generation", "function_calling"]
+        }
+    ],
+    "default_model": "gemini-1.5-flash",
+    "api_provider": "Google Generative AI"
+})
+
 @router.get("/models")
-async def get_available_models():
+async def get_available_models(request: Request):
     """
     Get information about available AI models.
     """
-    return {
-        "models": [
-            {
-                "name": "gemini-1.5-flash",
-                "description": "Fast and efficient model for most tasks",
-                "max_tokens": 2048,
-                "supported_features": ["text_generation", "function_calling"]
-            }
-        ],
-        "default_model": "gemini-1.5-flash",
-        "api_provider": "Google Generative AI"
-    }
+    return _AVAILABLE_MODELS(request)
 
 @router.post("/dev/generate-response")
-async def dev_generate_ai_response(request: ChatRequest):
+async def dev_generate_ai_response(request: ChatRequest, background_tasks: BackgroundTasks):
     """
     Development endpoint for AI generation with function calling.
     No authentication required for testing.
     """
     try:
-        logger.info(f"🧪 DEV: Generating AI response")
+        logger.info("🧪 DEV: Generating AI response")
         
-        # Validate request
-        if not request.contact:
-            raise HTTPException(status_code=400, detail="Contact information is required")
-        
-        if not request.user_message.strip():
-            raise HTTPException(status_code=400, detail="User message cannot be empty")
+        validate_chat_request(request)
         
         # Generate response with function calling support
         response = await ai_service.generate_response(
@@ -169,7 +245,7 @@ async def dev_generate_ai_response(request: ChatRequest):
             conversation_documents=request.conversation_documents
         )
         
-        logger.info(f"✅ DEV: Successfully generated AI response ({len(response)} characters)")
+        background_tasks.add_task(logger.info, "✅ DEV: Successfully generated AI response (%d characters)", len(response))
         
         return {
             "success": True,
@@ -184,12 +260,15 @@ async def dev_generate_ai_response(request: ChatRequest):
             }
         }
         
+    except HTTPException:
+        raise
+    
     except ValueError as e:
-        logger.error(f"❌ DEV: AI generation error: {e}")
+        logger.error("❌ DEV: AI generation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     
     except Exception as e:
-        logger.error(f"❌ DEV: Unexpected error in AI generation: {e}")
+        logger.error("❌ DEV: Unexpected error in AI generation: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 @router.post("/test-generation")
@@ -216,5 +295,5 @@ async def test_ai_generation(current_user = Depends(get_current_user)):
         }
         
     except Exception as e:
-        logger.error(f"❌ AI generation test failed: {e}")
+        logger.error("❌ AI generation test failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Test failed: {str(e)}")
\ No newline at end of file
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any, List, Optional
 import logging
 
-from ....core.auth import get_current_user, get_current_user_with_token
+from ....core.auth import get_current_user, get_current_user_with_token, AuthContext
 from ....services.database_service import database_service
 from ....models.database import (
     AgentCreate, AgentUpdate, AgentResponse,
@@ -16,6 +17,14 @@ from ....models.database import (
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def success_data(data: Any) -> ORJSONResponse:
+    """
+    Success envelope for read endpoints. Supabase rows are already plain JSON
+    types, so returning the response directly lets orjson encode them without
+    FastAPI's jsonable_encoder walking every row first.
+    """
+    return ORJSONResponse({"success": True, "data": data})
+
 # Health check for database service
 @router.get("/health")
 async def database_health():
@@ -28,7 +37,7 @@ async def database_health():
             "connection": "ok" if is_healthy else "failed"
         }
     except Exception as e:
-        logger.error(f"❌ Database health check failed: {e}")
+        logger.error("❌ Database health check failed: %s", e)
         return {
             "status": "unhealthy",
             "service": "database",
@@ -37,29 +46,26 @@ async def database_health():
 
 # User Agents Endpoints
 @router.get("/agents")
-async def get_user_agents(auth_data = Depends(get_current_user_with_token)):
+async def get_user_agents(auth_data: AuthContext = Depends(get_current_user_with_token)):
     """Get all agents for the current user"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         agents = await database_service.get_user_agents(current_user.id, token)
-        return {
-            "success": True,
-            "data": agents
-        }
+        return success_data(agents)
     except Exception as e:
-        logger.error(f"❌ Error fetching user agents: {e}")
+        logger.error("❌ Error fetching user agents: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/agents")
 async def create_user_agent(
     agent_data: AgentCreate,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Create a new user agent"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         agent = await database_service.create_user_agent(current_user.id, agent_data, token)
         return {
             "success": True,
@@ -67,19 +73,19 @@ async def create_user_agent(
             "message": f"Agent '{agent_data.name}' created successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error creating user agent: {e}")
+        logger.error("❌ Error creating user agent: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/agents/{agent_id}")
 async def update_user_agent(
     agent_id: str,
     updates: AgentUpdate,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Update a user agent"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         agent = await database_service.update_user_agent(agent_id, updates, token)
         return {
             "success": True,
@@ -87,25 +93,25 @@ async def update_user_agent(
             "message": "Agent updated successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error updating user agent: {e}")
+        logger.error("❌ Error updating user agent: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/agents/{agent_id}")
 async def delete_user_agent(
     agent_id: str,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Delete a user agent"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         success = await database_service.delete_user_agent(agent_id, token)
         return {
             "success": success,
             "message": "Agent deleted successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error deleting user agent: {e}")
+        logger.error("❌ Error deleting user agent: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Agent Integrations Endpoints
@@ -113,12 +119,12 @@ async def delete_user_agent(
 async def create_agent_integration(
     agent_id: str,
     integration_data: IntegrationCreate,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Create a new agent integration"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         integration = await database_service.create_agent_integration(agent_id, integration_data, token)
         return {
             "success": True,
@@ -126,25 +132,25 @@ async def create_agent_integration(
             "message": "Integration created successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error creating agent integration: {e}")
+        logger.error("❌ Error creating agent integration: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/integrations/{integration_id}")
 async def delete_agent_integration(
     integration_id: str,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Delete an agent integration"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         success = await database_service.delete_agent_integration(integration_id, token)
         return {
             "success": success,
             "message": "Integration deleted successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error deleting agent integration: {e}")
+        logger.error("❌ Error deleting agent integration: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Agent Documents Endpoints
@@ -152,12 +158,12 @@ async def delete_agent_integration(
 async def create_agent_document(
     agent_id: str,
     document_data: DocumentCreate,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Create a new agent document"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         document = await database_service.create_agent_document(agent_id, document_data, token)
         return {
             "success": True,
@@ -165,54 +171,52 @@ async def create_agent_document(
             "message": "Document created successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error creating agent document: {e}")
+        logger.error("❌ Error creating agent document: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/documents/{document_id}")
 async def delete_agent_document(
     document_id: str,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Delete an agent document"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         success = await database_service.delete_agent_document(document_id, token)
         return {
             "success": success,
             "message": "Document deleted successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error deleting agent document: {e}")
+        logger.error("❌ Error deleting agent document: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/agents/{agent_id}/documents")
 async def get_agent_documents(
     agent_id: str,
-    auth_data = Depends(get_current_user_with_token)
+    light: bool = False,
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
-    """Get all documents for an agent"""
+    """Get all documents for an agent; ?light=true leaves out content and extracted text"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
-        documents = await database_service.get_agent_documents(agent_id, token)
-        return {
-            "success": True,
-            "data": documents
-        }
+        current_user = auth_data.user
+        token = auth_data.token
+        documents = await database_service.get_agent_documents(agent_id, token, light=light)
+        return success_data(documents)
     except Exception as e:
-        logger.error(f"❌ Error fetching agent documents: {e}")
+        logger.error("❌ Error fetching agent documents: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/documents/{document_id}")
 async def get_document_by_id(
     document_id: str,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Get a specific document by ID"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         document = await database_service.get_document_by_id(document_id, token)
         if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -224,7 +228,7 @@ async def get_document_by_id(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error fetching document: {e}")
+        logger.error("❌ Error fetching document: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Conversation Documents Endpoints
@@ -232,12 +236,12 @@ async def get_document_by_id(
 async def save_conversation_document(
     agent_id: str,
     document_data: DocumentCreate,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Save a conversation document"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         document_id = await database_service.save_conversation_document(agent_id, document_data, token)
         return {
             "success": True,
@@ -245,52 +249,47 @@ async def save_conversation_document(
             "message": "Conversation document saved successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error saving conversation document: {e}")
+        logger.error("❌ Error saving conversation document: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/agents/{agent_id}/conversation-documents")
 async def get_conversation_documents(
     agent_id: str,
-    auth_data = Depends(get_current_user_with_token)
+    light: bool = False,
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
-    """Get conversation documents for an agent"""
+    """Get conversation documents for an agent; ?light=true leaves out content and extracted text"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
-        documents = await database_service.get_conversation_documents(agent_id, token)
-        return {
-            "success": True,
-            "data": documents
-        }
+        current_user = auth_data.user
+        token = auth_data.token
+        documents = await database_service.get_conversation_documents(agent_id, token, light=light)
+        return success_data(documents)
     except Exception as e:
-        logger.error(f"❌ Error fetching conversation documents: {e}")
+        logger.error("❌ Error fetching conversation documents: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/agents/{agent_id}/context")
 async def get_all_agent_context(
     agent_id: str,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Get all relevant documents for context building"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         context = await database_service.get_all_agent_context(agent_id, token)
-        return {
-            "success": True,
-            "data": context
-        }
+        return success_data(context)
     except Exception as e:
-        logger.error(f"❌ Error getting agent context: {e}")
+        logger.error("❌ Error getting agent context: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # User Profile Endpoints
 @router.get("/profile")
-async def get_user_profile(auth_data = Depends(get_current_user_with_token)):
+async def get_user_profile(auth_data: AuthContext = Depends(get_current_user_with_token)):
     """Get current user profile"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         profile = await database_service.get_user_profile(current_user.id, token)
         if profile is None:
             raise HTTPException(status_code=404, detail="User profile not found")
@@ -302,18 +301,18 @@ async def get_user_profile(auth_data = Depends(get_current_user_with_token)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error fetching user profile: {e}")
+        logger.error("❌ Error fetching user profile: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/profile")
 async def create_user_profile(
     profile_data: UserProfileCreate,
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """Create user profile"""
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
+        current_user = auth_data.user
+        token = auth_data.token
         profile = await database_service.create_user_profile(current_user.id, profile_data, token)
         return {
             "success": True,
@@ -321,5 +320,5 @@ async def create_user_profile(
             "message": "User profile created successfully"
         }
     except Exception as e:
-        logger.error(f"❌ Error creating user profile: {e}")
+        logger.error("❌ Error creating user profile: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
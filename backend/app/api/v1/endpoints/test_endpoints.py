@@ -3,6 +3,7 @@ from typing import Dict, Any
 import logging
 from ....services.document_service import document_service
 from ....services.ai_service import ai_service
+from .documents import validate_upload_size
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -16,15 +17,11 @@ async def test_document_processing(file: UploadFile = File(...)):
     try:
         logger.info(f"🧪 Testing document processing: {file.filename}")
         
-        # Read file content
-        file_data = await file.read()
+        validate_upload_size(file)
         
-        if len(file_data) == 0:
-            raise HTTPException(status_code=400, detail="Empty file uploaded")
-        
-        # Process the document
-        document_info = await document_service.process_file(
-            file_data=file_data,
+        # Process the document straight from the spooled upload
+        document_info = await document_service.process_upload(
+            stream=file.file,
             filename=file.filename or "test_file",
             content_type=file.content_type or ""
         )
@@ -38,6 +35,9 @@ async def test_document_processing(file: UploadFile = File(...)):
             "message": f"Successfully processed {file.filename} in test mode"
         }
         
+    except HTTPException:
+        raise
+    
     except ValueError as e:
         logger.error(f"❌ Test processing error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -127,13 +127,13 @@ async def test_document_service_basic():
         test_text = "Hello, world! This is a test document."
         test_bytes = test_text.encode('utf-8')
         
-        extracted = await document_service._extract_text_content(test_bytes)
+        extracted = document_service._extract_text_content(test_bytes)
         
         if extracted == test_text:
             return {
                 "status": "healthy",
                 "text_extraction": "working",
-                "supported_formats": len(document_service._get_supported_extensions())
+                "supported_formats": len(document_service.SUPPORTED_EXTENSIONS)
             }
         else:
             return {
@@ -10,8 +10,8 @@ Handles backend components of voice calls:
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, Any
 import logging
-from ....services.voice_service import voice_service
-from ....core.auth import get_current_user, get_current_user_with_token
+from ....services.voice_service import voice_service, SessionLimitError
+from ....core.auth import get_current_user, get_current_user_with_token, AuthContext
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,7 +19,7 @@ logger = logging.getLogger(__name__)
 @router.post("/session/create")
 async def create_voice_session(
     contact_data: Dict[str, Any],
-    auth_data = Depends(get_current_user_with_token)
+    auth_data: AuthContext = Depends(get_current_user_with_token)
 ):
     """
     Create a new voice session with ephemeral authentication
@@ -28,9 +28,9 @@ async def create_voice_session(
     as recommended by the Live API docs
     """
     try:
-        current_user = auth_data["user"]
-        token = auth_data["token"]
-        logger.info(f"🎤 Creating voice session for user {current_user.id}")
+        current_user = auth_data.user
+        token = auth_data.token
+        logger.info("Creating voice session for user %s", current_user.id)
         
         session_info = await voice_service.create_session(
             user_id=current_user.id,
@@ -43,8 +43,11 @@ async def create_voice_session(
             "session": session_info
         }
         
+    except SessionLimitError as e:
+        logger.warning("%s", e)
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        logger.error(f"❌ Failed to create voice session: {e}")
+        logger.error("Failed to create voice session: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/session/{session_id}/function-call")
@@ -66,7 +69,7 @@ async def handle_function_call(
         if not function_name:
             raise HTTPException(status_code=400, detail="Function name is required")
         
-        logger.info(f"🔧 Processing function call {function_name} for session {session_id}")
+        logger.info("Processing function call %s for session %s", function_name, session_id)
         
         result = await voice_service.handle_function_call(
             session_id=session_id,
@@ -77,7 +80,7 @@ async def handle_function_call(
         return result
         
     except Exception as e:
-        logger.error(f"❌ Function call failed: {e}")
+        logger.error("Function call failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/session/{session_id}/context")
@@ -101,7 +104,7 @@ async def get_session_context(
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"❌ Failed to get session context: {e}")
+        logger.error("Failed to get session context: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/session/{session_id}/end")
@@ -118,9 +121,20 @@ async def end_voice_session(
         return result
         
     except Exception as e:
-        logger.error(f"❌ Failed to end session: {e}")
+        logger.error("Failed to end session: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/health")
+async def voice_service_health():
+    """
+    Voice service health, including how full the per-session event logs are
+    """
+    return {
+        "status": "healthy",
+        "service": "voice_service",
+        "sessions": voice_service.stats()
+    }
+
 # Development endpoints (no auth required in DEBUG mode)
 from ....core.config import settings
 
@@ -132,7 +146,7 @@ if settings.DEBUG:
         Only available when DEBUG=True
         """
         try:
-            logger.info("🧪 DEV: Creating voice session")
+            logger.info("DEV: Creating voice session")
             
             session_info = await voice_service.create_session(
                 user_id="dev_user",
@@ -146,8 +160,10 @@ if settings.DEBUG:
                 "session": session_info
             }
             
+        except SessionLimitError as e:
+            raise HTTPException(status_code=503, detail=str(e))
         except Exception as e:
-            logger.error(f"❌ DEV: Failed to create voice session: {e}")
+            logger.error("DEV: Failed to create voice session: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
     @router.post("/dev/session/{session_id}/function-call")
@@ -166,7 +182,7 @@ if settings.DEBUG:
             if not function_name:
                 raise HTTPException(status_code=400, detail="Function name is required")
             
-            logger.info(f"🧪 DEV: Processing function call {function_name}")
+            logger.info("DEV: Processing function call %s", function_name)
             
             result = await voice_service.handle_function_call(
                 session_id=session_id,
@@ -180,7 +196,7 @@ if settings.DEBUG:
             }
             
         except Exception as e:
-            logger.error(f"❌ DEV: Function call failed: {e}")
+            logger.error("DEV: Function call failed: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
     @router.get("/dev/session/{session_id}/context")
@@ -201,5 +217,5 @@ if settings.DEBUG:
         except ValueError as e:
             raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
-            logger.error(f"❌ DEV: Failed to get session context: {e}")
+            logger.error("DEV: Failed to get session context: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
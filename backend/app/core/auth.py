@@ -1,41 +1,103 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from supabase import create_client
 from .config import settings
 
-# Initialize Supabase client
-supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+@lru_cache(maxsize=1)
+def get_supabase_client():
+    """Anon-key Supabase client used to verify tokens, created on first use"""
+    return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+
+logger = logging.getLogger(__name__)
+
+_SECRET_KEY_BYTES = settings.SECRET_KEY.encode()
 
 security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# sha256(token) -> (expires_at, user); insertion ordered, so the first key is the oldest
+_user_cache: Dict[str, Tuple[float, Any]] = {}
+# sha256(token) -> the Supabase lookup currently running for it
+_in_flight: Dict[str, asyncio.Future] = {}
+# How token lookups were served: from the cache, by joining a running lookup, or by Supabase
+_cache_stats = {"hits": 0, "shared": 0, "misses": 0}
+
+@dataclass(frozen=True, slots=True)
+class AuthContext:
+    """Authenticated Supabase user plus the bearer token used to act on their behalf"""
+    user: Any
+    token: str
+
+def _cache_ttl(token: str) -> float:
+    """AUTH_CACHE_TTL, clamped so a user is never cached past the token's exp"""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return 0.0
+    if exp is None:
+        return settings.AUTH_CACHE_TTL
+    return min(settings.AUTH_CACHE_TTL, exp - time.time())
+
+async def _verify_token(token: str, key: str) -> Any:
+    """Ask Supabase auth who the token belongs to and cache a positive answer"""
+    # supabase-py's auth client is blocking; keep the round trip off the event loop
+    response = await asyncio.to_thread(get_supabase_client().auth.get_user, token)
+    if not response or not response.user:
+        return None
+    
+    ttl = _cache_ttl(token)
+    if ttl > 0:
+        if len(_user_cache) >= settings.AUTH_CACHE_MAX_SIZE:
+            del _user_cache[next(iter(_user_cache))]
+        _user_cache[key] = (time.monotonic() + ttl, response.user)
+    return response.user
+
+async def _resolve_user(token: str) -> Any:
     """
-    Validate Supabase JWT token and return user info
+    Supabase user for a bearer token, or None if the token is rejected.
+    Verified users are cached briefly so a client's burst of requests costs
+    one round trip to Supabase auth; rejections are never cached. Concurrent
+    requests with the same token share a single in-flight lookup.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    key = hashlib.sha256(token.encode()).hexdigest()
+    entry = _user_cache.get(key)
+    if entry is not None:
+        if entry[0] > time.monotonic():
+            _cache_stats["hits"] += 1
+            return entry[1]
+        del _user_cache[key]
     
-    try:
-        token = credentials.credentials
-        
-        # Validate token with Supabase
-        try:
-            user = supabase.auth.get_user(token)
-            if not user or not user.user:
-                raise credentials_exception
-            return user.user
-        except Exception as e:
-            print(f"Auth error: {e}")
-            raise credentials_exception
-            
-    except JWTError:
-        raise credentials_exception
+    # No await between the check and the insert, so no lock is needed
+    task = _in_flight.get(key)
+    if task is None:
+        _cache_stats["misses"] += 1
+        task = asyncio.ensure_future(_verify_token(token, key))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    else:
+        _cache_stats["shared"] += 1
+    
+    # Shield so one client disconnecting doesn't cancel the others' lookup
+    return await asyncio.shield(task)
+
+def auth_cache_stats() -> Dict[str, Any]:
+    """Token cache counters since startup, for the detailed health check"""
+    lookups = sum(_cache_stats.values())
+    return {
+        **_cache_stats,
+        "cached_users": len(_user_cache),
+        "hit_rate": round((lookups - _cache_stats["misses"]) / lookups, 3) if lookups else None
+    }
 
-async def get_current_user_with_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user_with_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> AuthContext:
     """
     Validate Supabase JWT token and return both user info and token
     """
@@ -50,23 +112,32 @@ async def get_current_user_with_token(credentials: HTTPAuthorizationCredentials
         
         # Validate token with Supabase
         try:
-            user = supabase.auth.get_user(token)
-            if not user or not user.user:
+            user = await _resolve_user(token)
+            if user is None:
                 raise credentials_exception
-            return {"user": user.user, "token": token}
+            return AuthContext(user=user, token=token)
         except Exception as e:
-            print(f"Auth error: {e}")
+            logger.warning("Auth error: %s", e)
             raise credentials_exception
             
     except JWTError:
         raise credentials_exception
 
+async def get_current_user(auth: AuthContext = Depends(get_current_user_with_token)):
+    """
+    Validate Supabase JWT token and return user info.
+    Built on get_current_user_with_token so FastAPI's per-request dependency
+    cache resolves the Supabase lookup once even if both are requested.
+    """
+    return auth.user
+
 # Optional: Simple API key auth for internal services
 async def get_api_key(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Simple API key validation for internal services
     """
-    if credentials.credentials == settings.SECRET_KEY:
+    # Constant-time comparison, so response timing doesn't leak the key
+    if hmac.compare_digest(credentials.credentials.encode(), _SECRET_KEY_BYTES):
         return {"service": "internal"}
     
     raise HTTPException(
@@ -1,3 +1,5 @@
+import os
+from functools import lru_cache
 from typing import List
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
@@ -9,6 +11,8 @@ class Settings(BaseSettings):
     APP_NAME: str = "Gather API"
     VERSION: str = "1.0.0"
     DEBUG: bool = True
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "json" for one structured object per line
     
     # Supabase (will use during Stages 1-3)
     SUPABASE_URL: str
@@ -18,6 +22,8 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
+    AUTH_CACHE_TTL: float = 30.0  # Seconds a verified token's user is reused (never past the token's exp)
+    AUTH_CACHE_MAX_SIZE: int = 10000
     
     # External APIs (from existing .env)
     GOOGLE_API_KEY: str = ""
@@ -27,8 +33,46 @@ class Settings(BaseSettings):
     NOTION_CLIENT_SECRET: str = ""
     FIRECRAWL_API_KEY: str = ""
     TAVILY_API_KEY: str = ""
+    GEMINI_MAX_CONCURRENCY: int = 8  # Upstream Gemini requests allowed in flight at once
+    GEMINI_CONTEXT_CACHE: bool = False  # Send long system prompts once via Gemini cachedContents
+    GEMINI_CONTEXT_CACHE_TTL: int = 600  # Seconds a cachedContents entry lives without use
+    # Reuse replies to near-identical messages (needs numpy). Each uncached
+    # turn also makes one embedContent call; it runs alongside the chat
+    # request, so it adds Gemini quota use rather than latency, and a hit
+    # cancels a chat request that has already been sent
+    SEMANTIC_CACHE: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92  # Cosine similarity counted as the same question
+    SEMANTIC_CACHE_SIZE: int = 1024  # Replies kept per contact/document context
     
-    # CORS - Allow common development ports
+    # Document processing
+    BULK_CONCURRENCY: int = 4  # Files processed in parallel per bulk request
+    DOCUMENT_WORKERS: int = min(4, os.cpu_count() or 1)  # Parser threads
+    DOCUMENT_PROCESS_WORKERS: int = 0  # >0 parses PDF/Office files in a process pool of this size
+    MAX_BULK_FILES: int = 10  # Files accepted per bulk upload request
+    SUMMARY_CACHE_PATH: str = ""  # SQLite file for document summaries; empty disables the cache
+    
+    # Voice sessions: each session's event log keeps its first SINK entries
+    # (how the call started) plus the most recent WINDOW entries
+    VOICE_SESSION_SINK_ENTRIES: int = 4
+    VOICE_SESSION_WINDOW_ENTRIES: int = 50
+    MAX_VOICE_SESSIONS: int = 1000  # Sessions held in memory per process
+    
+    # Database reads
+    DB_CACHE_TTL: float = 30.0  # Seconds agent/document/profile reads are reused within a process
+    BLOCKING_IO_THREADS: int = 32  # Threads for blocking Supabase calls (asyncio.to_thread)
+    
+    # Document storage: bodies of at least DOCUMENT_STORAGE_MIN_CHARS go to this
+    # Supabase Storage bucket instead of the agent_documents row ("" keeps them inline)
+    DOCUMENT_STORAGE_BUCKET: str = ""
+    DOCUMENT_STORAGE_MIN_CHARS: int = 64 * 1024
+    
+    # Health checks
+    HEALTH_CACHE_TTL: float = 2.0  # Seconds a health result is reused across probes
+    
+    # CORS
+    CORS_MAX_AGE: int = 600  # Seconds browsers may reuse a preflight answer
+    
+    # Allow common development ports
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:3000",   # Common React port
         "http://localhost:5173",   # Vite default port
@@ -47,4 +91,13 @@ class Settings(BaseSettings):
         case_sensitive = True
         extra = "allow"  # Allow extra fields from .env
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    The process-wide Settings, parsed from the environment/.env once.
+    This happens at import, through the module-level `settings` below, which
+    is what the app reads; tests change values with monkeypatch.setattr on it.
+    """
+    return Settings()
+
+settings = get_settings()
\ No newline at end of file
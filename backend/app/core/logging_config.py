@@ -0,0 +1,76 @@
+import atexit
+import logging
+import logging.config
+import logging.handlers
+import queue
+import orjson
+from .config import settings
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any `extra=` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(payload, default=str).decode()
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a listener in the same process. The stock prepare()
+    formats the record with a default formatter and drops exc_info, which
+    would paste tracebacks into the message before JsonFormatter sees them;
+    here only the message arguments are resolved, and exception info is
+    left for the real formatter on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging():
+    """Configure root logging from LOG_LEVEL / LOG_FORMAT ("text" or "json")"""
+    formatter = "json" if settings.LOG_FORMAT.lower() == "json" else "text"
+    logging.config.dictConfig({
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "text": {"format": "%(levelname)s:%(name)s:%(message)s"},
+            "json": {"()": JsonFormatter},
+        },
+        "handlers": {
+            "console": {
+                "class": "logging.StreamHandler",
+                "formatter": formatter,
+            },
+        },
+        "root": {
+            "level": settings.LOG_LEVEL.upper(),
+            "handlers": ["console"],
+        },
+    })
+    
+    # Move the actual writes to a background thread: the event loop only puts
+    # records on a queue, and a listener thread formats and writes them
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [LocalQueueHandler(log_queue)]
+    listener.start()
+    atexit.register(listener.stop)  # Flush what's still queued on shutdown
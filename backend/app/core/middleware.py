@@ -0,0 +1,85 @@
+from typing import Dict
+from fastapi.responses import ORJSONResponse
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestBodyLimitMiddleware:
+    """
+    Reject oversized POST bodies by their Content-Length header before anything reads them.
+
+    `limits` maps a path prefix to the largest body it accepts; the longest
+    matching prefix wins. Oversized requests get a 413, so a body that is
+    going to be refused anyway is never drained, parsed or spooled to disk.
+    Only the upper bound is enforced: some routes under a limited prefix
+    take no body at all, and the upload endpoints reject empty files
+    themselves (validate_upload_size). Bodies sent without a
+    Content-Length (chunked) are counted as they are received and cut off
+    with a 413 once they pass the limit. Paths with no matching prefix are
+    passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limit_for(self, path: str):
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    def _limited_receive(self, receive: Receive, limit: int) -> Receive:
+        """Wrap receive so the body is cut off as soon as it passes the limit"""
+        received = 0
+
+        async def receive_with_limit() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside body parsing, FastAPI lets HTTPException through unchanged
+                    raise HTTPException(status_code=413, detail=f"Request body exceeds {limit // (1024 * 1024)}MB limit")
+            return message
+
+        return receive_with_limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self._limit_for(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = None
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                content_length = value
+                break
+
+        if content_length is None:
+            # Chunked upload: no size up front, so count bytes as they arrive
+            await self.app(scope, self._limited_receive(receive, limit), send)
+            return
+
+        try:
+            size = int(content_length)
+        except ValueError:
+            size = -1
+
+        if size < 0:
+            response = ORJSONResponse(status_code=400, content={"detail": "Invalid Content-Length header"})
+        elif size > limit:
+            response = ORJSONResponse(status_code=413, content={"detail": f"Request body exceeds {limit // (1024 * 1024)}MB limit"})
+        else:
+            response = None
+
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -1,23 +1,67 @@
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import time
 import logging
+import orjson
 from .core.config import settings
+from .core.logging_config import configure_logging
+from .core.middleware import RequestBodyLimitMiddleware
 from .api.v1.api import api_router
+from .api.v1.endpoints import health as health_endpoints
+from .services.ai_service import ai_service
+from .services.document_service import document_service
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown"""
+    loop = asyncio.get_running_loop()
+    # supabase-py is synchronous, so every query holds a worker thread for its
+    # round trip; the stock pool (cpu_count + 4 threads) would cap concurrent
+    # queries well below what Supabase can serve
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=settings.BLOCKING_IO_THREADS, thread_name_prefix="blocking-io"))
+    logger.info(f"🚀 Event loop: {type(loop).__module__}.{type(loop).__name__} ({type(asyncio.get_event_loop_policy()).__name__})")
+    await ai_service.warm_up()
+    yield
+    # Close the shared HTTP clients so pooled connections aren't leaked
+    await ai_service.close()
+    await health_endpoints.close_http_client()
+    # Stop the parser pools (and any worker processes)
+    document_service.close()
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
     description="Gather AI Assistant Platform - Python Backend",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # orjson encodes large text payloads much faster
+)
+
+# Body size limits - registered before CORS so rejections still carry CORS headers
+_UPLOAD_LIMIT = document_service.MAX_FILE_SIZE + 1024 * 1024  # room for multipart framing
+app.add_middleware(
+    RequestBodyLimitMiddleware,
+    limits={
+        "/api/v1/ai": document_service.MAX_FILE_SIZE,
+        "/api/v1/documents": _UPLOAD_LIMIT,
+        "/api/v1/documents/bulk-process": _UPLOAD_LIMIT * settings.MAX_BULK_FILES,
+        "/api/v1/documents/dev/bulk-process": _UPLOAD_LIMIT * settings.MAX_BULK_FILES,
+    },
 )
 
+# Compress larger responses (extracted document text, AI replies)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # CORS middleware - More permissive for development
 if settings.DEBUG:
     # Allow all origins in development
@@ -27,6 +71,7 @@ if settings.DEBUG:
         allow_credentials=False,  # Must be False when allow_origins=["*"]
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
         allow_headers=["*"],
+        max_age=settings.CORS_MAX_AGE,
     )
 else:
     # Restrictive CORS for production
@@ -36,26 +81,36 @@ else:
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
         allow_headers=["*"],
+        max_age=settings.CORS_MAX_AGE,
     )
 
+# Liveness probes are polled constantly and nobody reads their timing
+_UNTIMED_PATHS = frozenset({"/health", "/api/v1/health/"})
+
 # Request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
+    if request.url.path in _UNTIMED_PATHS:
+        return await call_next(request)
+    # Monotonic, integer clock: immune to wall-clock adjustments mid-request
+    start_time = time.perf_counter_ns()
     response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
+    process_time = (time.perf_counter_ns() - start_time) / 1e9
+    response.headers["X-Process-Time"] = f"{process_time:.6f}"
     return response
 
+# Health check body is fixed apart from the timestamp: encode the rest once
+# and splice the timestamp in as the last field
+_HEALTH_BODY_PREFIX = orjson.dumps({
+    "status": "healthy",
+    "service": "gather-api",
+    "version": settings.VERSION,
+})[:-1] + b',"timestamp":'
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "service": "gather-api",
-        "version": settings.VERSION,
-        "timestamp": time.time()
-    }
+    return Response(content=_HEALTH_BODY_PREFIX + b"%.6f}" % time.time(), media_type="application/json")
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
@@ -64,7 +119,7 @@ app.include_router(api_router, prefix="/api/v1")
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error", "error": str(exc) if settings.DEBUG else "Internal error"}
     )
@@ -75,5 +130,7 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8001,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        loop="uvloop",
+        http="httptools",
     )
\ No newline at end of file
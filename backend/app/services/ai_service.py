@@ -1,14 +1,146 @@
 import asyncio
+import hashlib
 import logging
+import time
+from collections import OrderedDict
+from functools import lru_cache
 import httpx
-import json
-from typing import Dict, Any, List, Optional
+import orjson
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from ..core.config import settings
 from .integrations_service import integrations_service
+from ..utils.cache import async_ttl_cache
+from ..utils.summary_cache import SummaryCache, summary_cache_key
 
 logger = logging.getLogger(__name__)
 
+# Request bodies are encoded with orjson (see _encode_payload), so the
+# content type is set by hand. Chat payloads carry tool results, which may
+# hold values JSON has no type for (datetimes and the like); those are sent
+# as their str().
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Parts of the chat payload that are the same on every turn. Built once and
+# shared by every request, so they must never be mutated.
+CHAT_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 2048,
+}
+
+SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT", 
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    }
+]
+
+# Tools offered to the model on every chat turn
+FUNCTION_DECLARATIONS = [
+    {
+        "name": "search_web",
+        "description": "Search the web for current information, news, facts, or real-time data using Tavily AI search engine. Use when users ask to search, look up, google, find information, or get current/recent data about anything.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The search query - what to search for on the web"
+                },
+                "searchDepth": {
+                    "type": "string",
+                    "description": "Search depth for better results",
+                    "enum": ["basic", "advanced"],
+                    "default": "basic"
+                },
+                "maxResults": {
+                    "type": "integer",
+                    "description": "Maximum number of search results to return (1-20)",
+                    "default": 5
+                }
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "scrape_website",
+        "description": "Extract content from websites when users ask to scrape, crawl, or get content from specific URLs. Use when user asks to go to a website and get its content.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL to scrape content from"
+                },
+                "extractType": {
+                    "type": "string",
+                    "description": "Type of content to extract",
+                    "enum": ["text", "markdown", "html"],
+                    "default": "markdown"
+                },
+                "includeImages": {
+                    "type": "boolean",
+                    "description": "Whether to include images",
+                    "default": False
+                }
+            },
+            "required": ["url"]
+        }
+    }
+]
+
+CHAT_TOOLS = [{"function_declarations": FUNCTION_DECLARATIONS}]
+
+# The shared payload blocks above, serialized once. Keyed by id() since
+# they are module globals that live (unchanged) as long as the process.
+_STATIC_JSON = {
+    id(block): orjson.dumps(block)
+    for block in (CHAT_GENERATION_CONFIG, SAFETY_SETTINGS, CHAT_TOOLS)
+}
+
+def _encode_payload(payload: Dict[str, Any]) -> bytes:
+    """orjson.dumps(payload), splicing in the pre-serialized shared blocks"""
+    return b"{" + b",".join(
+        orjson.dumps(key) + b":" + (_STATIC_JSON.get(id(value)) or orjson.dumps(value, default=str))
+        for key, value in payload.items()
+    ) + b"}"
+
+# Identical for every contact, so it opens the system prompt: Gemini's implicit
+# caching matches on the longest shared prefix of a request.
+STATIC_TOOL_PREAMBLE = "IMPORTANT: You have access to web search and website scraping functions. Use them when users ask about current information, websites, or content from the internet. Available functions:\n\n- search_web: Search for current information using Tavily\n- scrape_website: Extract content from websites using Firecrawl\n\nUse these functions proactively when needed."
+
 class AIService:
+    CHAT_MODEL = "models/gemini-1.5-flash"
+    SUMMARY_MODEL = "models/gemini-1.5-flash"
+    EMBEDDING_MODEL = "models/text-embedding-004"
+    # Gemini only caches contexts of at least ~2048 tokens (~4 chars per token)
+    CONTEXT_CACHE_MIN_CHARS = 8192
+    SUMMARY_MAX_CHARS = 4000  # Document text sent to Gemini for a summary
+    SUMMARY_BATCH_SIZE = 8  # Documents summarized per Gemini request
+    HISTORY_TOKEN_BUDGET = 3000  # Approximate tokens of chat history sent with each turn
+    HISTORY_WINDOW_STEP = 8  # History is cut at multiples of this many messages
+    # Longer history messages are cut down to this; kept under the budget
+    # (~4 chars per token) so a truncated message still leaves room for older turns
+    HISTORY_MESSAGE_MAX_CHARS = HISTORY_TOKEN_BUDGET * 4 - 2048
+    HISTORY_MESSAGE_MIN_CHARS = 256  # Smaller budget remainders aren't worth a truncated message
+    DOCUMENT_CONTEXT_CHARS = 2000  # Per-document text included in the system prompt
+    CONTEXT_CACHE_SIZE = 128  # Gemini cachedContents entries tracked, least recently used evicted
+    RESPONSE_CACHE_TTL = 30.0  # Seconds an answer is reused for an identical request
+    RESPONSE_CACHE_SIZE = 256
+    
     def __init__(self):
         self.google_api_key = settings.GOOGLE_API_KEY
         if not self.google_api_key:
@@ -17,14 +149,70 @@ class AIService:
         # Gemini API endpoints
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
         
-        # Initialize HTTP client with proper configuration
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(60.0),  # 60 second timeout for AI requests
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-        )
+        # Cap concurrent upstream calls so bursts queue here instead of
+        # turning into a wave of 429s from Gemini
+        self.max_concurrency = settings.GEMINI_MAX_CONCURRENCY
+        self.gemini_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        
+        # Created on first use, inside the running loop; see the client property
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Function declarations for integrations
-        self.function_declarations = self._get_function_declarations()
+        self.function_declarations = FUNCTION_DECLARATIONS
+        self.tools = CHAT_TOOLS
+        
+        # hash of system prompt -> (usable_until, cachedContents name) on Gemini's side
+        self._cached_contents: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        # hash of system prompt -> running cachedContents create, so concurrent misses share one
+        self._creating_contents: Dict[bytes, asyncio.Future] = {}
+        # cache name -> running TTL refresh; holding the task keeps it from being collected
+        self._extending: Dict[str, asyncio.Task] = {}
+        
+        # Summaries that outlive the process; None when SUMMARY_CACHE_PATH is unset
+        self.summary_cache = SummaryCache(settings.SUMMARY_CACHE_PATH) if settings.SUMMARY_CACHE_PATH else None
+        
+        # Replies reused for paraphrased questions; None unless SEMANTIC_CACHE is on
+        self.semantic_cache = None
+        if settings.SEMANTIC_CACHE:
+            # Imported here so numpy is only needed when the cache is enabled
+            from ..utils.semantic_cache import SemanticResponseCache
+            self.semantic_cache = SemanticResponseCache(settings.SEMANTIC_CACHE_THRESHOLD, settings.SEMANTIC_CACHE_SIZE)
+        
+        # payload hash -> running generate call, and -> (expires_at, text) once done
+        self._generating: Dict[bytes, asyncio.Future] = {}
+        self._response_cache: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        One pooled client for every Gemini call. Over HTTP/2 concurrent calls
+        multiplex on a shared connection; the pool still keeps a warm
+        connection per allowed call in case the server negotiates HTTP/1.1.
+        The transport retries connection failures (not HTTP errors) twice.
+        
+        The service is a module-level singleton, so the client is built on
+        first use from inside the running loop (uvloop in production, see the
+        Dockerfile) rather than at import. A different loop, as when tests
+        call asyncio.run more than once, gets a fresh client.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(60.0),  # 60 second timeout for AI requests
+                transport=httpx.AsyncHTTPTransport(
+                    http2=True,
+                    retries=2,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=self.max_concurrency,
+                        max_connections=self.max_concurrency * 2,
+                        keepalive_expiry=30.0
+                    )
+                )
+            )
+            self._client_loop = loop
+        return self._client
     
     async def generate_response(
         self,
@@ -38,94 +226,397 @@ class AIService:
         This replaces the frontend geminiService for better performance and security.
         """
         try:
-            logger.info(f"🤖 Generating response for {contact.get('name', 'Unknown Contact')}")
+            logger.info("🤖 Generating response for %s", contact.get('name', 'Unknown Contact'))
             
             if not self.google_api_key:
                 raise ValueError("Google API key not configured")
             
-            # Build context from contact info and documents
-            context = self._build_contact_context(contact, conversation_documents or [])
-            
-            # Build conversation history for function calling API
-            conversation_contents = self._build_conversation_contents(chat_history, user_message, contact.get('name', 'AI'))
+            payload, conversation_contents = self._build_generate_payload(contact, user_message, chat_history, conversation_documents)
             
-            logger.debug(f"📝 Sending conversation to Gemini API with function calling support")
+            # Identical requests (double submits, client retries) share one Gemini call
+            key = hashlib.blake2b(_encode_payload(payload), digest_size=16).digest()
+            cached = self._response_cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                logger.info("♻️ Returning recent response for identical request")
+                return cached[1]
             
-            # Prepare request payload with function calling
-            payload = {
-                "contents": conversation_contents,
-                "tools": [
-                    {
-                        "function_declarations": self.function_declarations
-                    }
-                ],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 2048,
-                },
-                "safetySettings": [
-                    {
-                        "category": "HARM_CATEGORY_HARASSMENT", 
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_HATE_SPEECH",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    }
-                ],
-                "systemInstruction": {
-                    "parts": [
-                        {
-                            "text": context + "\n\nIMPORTANT: You have access to web search and website scraping functions. Use them when users ask about current information, websites, or content from the internet. Available functions:\n\n- search_web: Search for current information using Tavily\n- scrape_website: Extract content from websites using Firecrawl\n\nUse these functions proactively when needed."
-                        }
-                    ]
-                }
-            }
-            
-            # Make initial API request
-            response = await self._call_gemini_api('models/gemini-1.5-flash:generateContent', payload)
+            task = self._generating.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._generate(payload, conversation_contents, contact))
+                self._generating[key] = task
+                task.add_done_callback(lambda done: self._store_generated(key, done))
             
-            # Handle function calling response
-            return await self._handle_function_calling_response(response, conversation_contents, payload, contact)
+            # Shield so one caller disconnecting doesn't cancel the shared call
+            text, _ = await asyncio.shield(task)
+            return text
             
         except Exception as error:
-            logger.error(f"❌ Error generating AI response: {error}")
+            logger.error("❌ Error generating AI response: %s", error)
             raise ValueError(f"Failed to generate AI response: {str(error)}")
     
+    async def _generate(
+        self,
+        payload: Dict[str, Any],
+        conversation_contents: List[Dict[str, Any]],
+        contact: Dict[str, Any]
+    ) -> Tuple[str, bool]:
+        """Run one chat turn; returns the text and whether any tools were called"""
+        turns_before = len(conversation_contents)
+        
+        # The embedding round trip runs alongside the first Gemini request
+        # rather than in front of it, so a semantic miss costs no extra latency
+        semantic = None
+        if self.semantic_cache is not None:
+            semantic = asyncio.ensure_future(self._semantic_query(payload, conversation_contents))
+        
+        payload = await self._apply_context_cache(payload)
+        
+        # Make initial API request. Tool calls only run after the semantic
+        # lookup below, so a hit never leaves a half-run tool behind
+        first_call = asyncio.ensure_future(self._call_gemini_api(f'{self.CHAT_MODEL}:generateContent', payload))
+        
+        context_key = query = None
+        if semantic is not None:
+            try:
+                context_key, query = await semantic
+            except BaseException:
+                first_call.cancel()
+                raise
+            if query is not None:
+                reply = self.semantic_cache.lookup(context_key, query)
+                if reply is not None:
+                    first_call.cancel()
+                    # Retrieve an error it may already have, so it isn't logged as unhandled
+                    first_call.add_done_callback(lambda done: done.cancelled() or done.exception())
+                    logger.info("♻️ Returning cached reply to a similar message")
+                    return reply, False
+        
+        response = await first_call
+        
+        # Handle function calling response
+        text = await self._handle_function_calling_response(response, conversation_contents, payload, contact)
+        used_tools = len(conversation_contents) > turns_before
+        
+        if query is not None and not used_tools:
+            self.semantic_cache.insert(context_key, query, text)
+        return text, used_tools
+    
+    async def _semantic_query(self, payload: Dict[str, Any], conversation_contents: List[Dict[str, Any]]):
+        """
+        (context key, normalized embedding) of the new message and the turn
+        before it. The embedding is None if Gemini couldn't embed the text,
+        in which case the turn just skips the semantic cache.
+        """
+        system_text = payload["systemInstruction"]["parts"][0]["text"]
+        context_key = hashlib.blake2b(system_text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        
+        text = "\n".join(
+            part.get('text', '') for turn in conversation_contents[-2:] for part in turn["parts"]
+        )
+        try:
+            response = await self._call_gemini_api(f'{self.EMBEDDING_MODEL}:embedContent', {
+                "model": self.EMBEDDING_MODEL,
+                "content": {"parts": [{"text": text}]}
+            })
+            return context_key, self.semantic_cache.prepare(response["embedding"]["values"])
+        except Exception as e:
+            logger.warning("⚠️ Could not embed message for the semantic cache: %s", e)
+            return context_key, None
+    
+    def _store_generated(self, key: bytes, done: asyncio.Future):
+        """Done callback for a shared generate call; keeps tool-free answers for a short while"""
+        self._generating.pop(key, None)
+        if done.cancelled() or done.exception() is not None:
+            return
+        
+        text, used_tools = done.result()
+        if used_tools:
+            # Tools fetch live data (and may have side effects), so don't replay their results
+            return
+        
+        self._response_cache[key] = (time.monotonic() + self.RESPONSE_CACHE_TTL, text)
+        if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+    
+    async def generate_response_stream(
+        self,
+        contact: Dict[str, Any],
+        user_message: str,
+        chat_history: List[Dict[str, Any]],
+        conversation_documents: List[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the AI response as text chunks as Gemini produces them.
+        A function-calling turn can't be streamed, so its parts are buffered
+        until the turn ends; the tools are then run and the follow-up answer
+        is streamed in turn.
+        """
+        logger.info("🤖 Streaming response for %s", contact.get('name', 'Unknown Contact'))
+        
+        if not self.google_api_key:
+            raise ValueError("Google API key not configured")
+        
+        payload, conversation_contents = self._build_generate_payload(contact, user_message, chat_history, conversation_documents)
+        payload = await self._apply_context_cache(payload)
+        
+        parts = []
+        streamed_chars = 0
+        async for chunk in self._stream_gemini_api(f'{self.CHAT_MODEL}:streamGenerateContent', payload):
+            for candidate in chunk.get('candidates', [])[:1]:
+                for part in candidate.get('content', {}).get('parts', []):
+                    parts.append(part)
+                    if 'text' in part and part['text']:
+                        streamed_chars += len(part['text'])
+                        yield part['text']
+        
+        function_calls = [part['functionCall'] for part in parts if 'functionCall' in part]
+        if function_calls:
+            await self._run_function_calls(function_calls, conversation_contents)
+            
+            follow_up_payload = self._follow_up_payload(payload, conversation_contents)
+            
+            follow_up_chars = 0
+            async for chunk in self._stream_gemini_api(f'{self.CHAT_MODEL}:streamGenerateContent', follow_up_payload):
+                for candidate in chunk.get('candidates', [])[:1]:
+                    for part in candidate.get('content', {}).get('parts', []):
+                        if 'text' in part and part['text']:
+                            follow_up_chars += len(part['text'])
+                            yield part['text']
+            
+            if follow_up_chars:
+                logger.info("✅ Streamed response with function calls (%s characters)", follow_up_chars)
+            else:
+                yield "I executed the requested function but couldn't generate a proper response. Please try again."
+        elif not streamed_chars:
+            raise ValueError('Empty response from Gemini API')
+        else:
+            logger.info("✅ Streamed response (%s characters)", streamed_chars)
+    
+    def _build_generate_payload(
+        self,
+        contact: Dict[str, Any],
+        user_message: str,
+        chat_history: List[Dict[str, Any]],
+        conversation_documents: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Build the Gemini request payload and the conversation contents it carries"""
+        # Build context from contact info and documents
+        context = self._build_contact_context(contact, conversation_documents or [])
+        
+        # Build conversation history for function calling API
+        conversation_contents = self._build_conversation_contents(chat_history, user_message, contact.get('name', 'AI'))
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "📝 Sending %s turns (~%s tokens) to Gemini API with function calling support",
+                len(conversation_contents),
+                (len(context) + sum(len(str(part.get('text', ''))) for turn in conversation_contents for part in turn["parts"])) // 4
+            )
+        
+        # Only the contents and the context change per turn; the rest is shared
+        payload = {
+            "contents": conversation_contents,
+            "tools": self.tools,
+            "generationConfig": CHAT_GENERATION_CONFIG,
+            "safetySettings": SAFETY_SETTINGS,
+            "systemInstruction": {
+                "parts": [
+                    {
+                        "text": context
+                    }
+                ]
+            }
+        }
+    
+        return payload, conversation_contents
+    
+    async def _apply_context_cache(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        With GEMINI_CONTEXT_CACHE on, swap a long system prompt and the tool
+        declarations for a reference to a Gemini cachedContents entry holding
+        them, so they aren't re-sent (and are billed at the cached rate) on
+        every turn. Falls back to the inline payload on any caching error.
+        """
+        if not settings.GEMINI_CONTEXT_CACHE:
+            return payload
+        
+        system_text = payload["systemInstruction"]["parts"][0]["text"]
+        if len(system_text) < self.CONTEXT_CACHE_MIN_CHARS:
+            return payload
+        
+        try:
+            cache_name = await self._get_cached_content(system_text)
+        except Exception as e:
+            logger.warning("⚠️ Gemini context cache unavailable, sending prompt inline: %s", e)
+            return payload
+        
+        cached_payload = {key: value for key, value in payload.items() if key not in ("systemInstruction", "tools")}
+        cached_payload["cachedContent"] = cache_name
+        return cached_payload
+    
+    async def _get_cached_content(self, system_text: str) -> str:
+        """Name of the cachedContents entry for this system prompt, creating it if needed"""
+        key = hashlib.blake2b(system_text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        ttl = settings.GEMINI_CONTEXT_CACHE_TTL
+        now = time.monotonic()
+        
+        entry = self._cached_contents.get(key)
+        if entry is not None and entry[0] > now:
+            usable_until, cache_name = entry
+            self._cached_contents.move_to_end(key)
+            if usable_until - now < ttl / 2 and cache_name not in self._extending:
+                # Conversation is still going: push the expiry out without holding up this turn
+                self._extending[cache_name] = asyncio.create_task(self._extend_cached_content(key, cache_name))
+            return cache_name
+        
+        # Concurrent first turns for one contact share a single entry; each
+        # extra one would be billed for storage until its TTL ran out
+        task = self._creating_contents.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._create_cached_content(key, system_text))
+            self._creating_contents[key] = task
+            task.add_done_callback(lambda _: self._creating_contents.pop(key, None))
+        # Shield so one caller disconnecting doesn't cancel the others' create
+        return await asyncio.shield(task)
+    
+    async def _create_cached_content(self, key: bytes, system_text: str) -> str:
+        """Create the cachedContents entry for a system prompt and remember its name"""
+        ttl = settings.GEMINI_CONTEXT_CACHE_TTL
+        response = await self.client.post(
+            f"{self.base_url}/cachedContents",
+            content=orjson.dumps({
+                "model": self.CHAT_MODEL,
+                "systemInstruction": {"parts": [{"text": system_text}]},
+                "tools": self.tools,
+                "ttl": f"{ttl}s"
+            }),
+            headers=JSON_HEADERS,
+            params={"key": self.google_api_key}
+        )
+        if response.status_code != 200:
+            raise ValueError(f"cachedContents create failed: {response.status_code} - {response.text}")
+        
+        cache_name = orjson.loads(response.content)["name"]
+        # Stop using an entry a little before Gemini expires it
+        self._cached_contents[key] = (time.monotonic() + ttl * 0.9, cache_name)
+        if len(self._cached_contents) > self.CONTEXT_CACHE_SIZE:
+            self._cached_contents.popitem(last=False)
+        logger.info("🗄️ Created Gemini context cache %s (%s chars)", cache_name, len(system_text))
+        return cache_name
+    
+    async def _extend_cached_content(self, key: bytes, cache_name: str):
+        """Reset a cachedContents entry's TTL; on failure it simply expires and is recreated"""
+        ttl = settings.GEMINI_CONTEXT_CACHE_TTL
+        try:
+            response = await self.client.patch(
+                f"{self.base_url}/{cache_name}",
+                content=orjson.dumps({"ttl": f"{ttl}s"}),
+                headers=JSON_HEADERS,
+                params={"key": self.google_api_key, "updateMask": "ttl"}
+            )
+            if response.status_code == 200 and key in self._cached_contents:
+                self._cached_contents[key] = (time.monotonic() + ttl * 0.9, cache_name)
+        except httpx.HTTPError as e:
+            logger.warning("⚠️ Could not extend Gemini context cache %s: %s", cache_name, e)
+        finally:
+            self._extending.pop(cache_name, None)
+    
+    def _truncate_text(self, text: str, max_chars: int) -> str:
+        """
+        Cut text to at most max_chars, backing off to the last paragraph,
+        line or word break so the model doesn't see a half-split token.
+        """
+        if len(text) <= max_chars:
+            return text
+        
+        cut = text[:max_chars]
+        for separator in ("\n\n", "\n", " "):
+            index = cut.rfind(separator)
+            if index > max_chars // 2:
+                return cut[:index]
+        return cut
+    
     async def summarize_document(self, document_content: str, filename: str) -> str:
         """
         Generate a summary of a document using Gemini API.
         """
+        summaries = await self.summarize_documents([(document_content, filename)])
+        return summaries[0]
+    
+    async def summarize_documents(self, documents: List[Tuple[str, str]]) -> List[str]:
+        """
+        Summarize several (content, filename) pairs, sending up to
+        SUMMARY_BATCH_SIZE documents per Gemini request. Summaries come back
+        in the order the documents were given.
+        
+        With SUMMARY_CACHE_PATH set, summaries are kept by a hash of the text
+        Gemini would see, so a re-uploaded or re-processed file is answered
+        from disk instead of another Gemini call.
+        """
+        summaries: List[Optional[str]] = [None] * len(documents)
+        keys = []
+        if self.summary_cache is not None:
+            keys = [
+                summary_cache_key(self.SUMMARY_MODEL, self._truncate_text(content, self.SUMMARY_MAX_CHARS))
+                for content, _ in documents
+            ]
+            cached = await self.summary_cache.get_many(keys)
+            summaries = [cached.get(key) for key in keys]
+        
+        pending = [index for index, summary in enumerate(summaries) if summary is None]
+        if not pending:
+            logger.info("✅ All %s summaries served from cache", len(documents))
+            return summaries
+        
+        batches = [
+            pending[start:start + self.SUMMARY_BATCH_SIZE]
+            for start in range(0, len(pending), self.SUMMARY_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*[
+            self._summarize_batch([documents[index] for index in batch]) for batch in batches
+        ])
+        
+        generated = {}
+        for batch, batch_results in zip(batches, results):
+            for index, (summary, is_generated) in zip(batch, batch_results):
+                summaries[index] = summary
+                if is_generated and keys:
+                    generated[keys[index]] = summary
+        
+        if generated:
+            await self.summary_cache.set_many(generated, self.SUMMARY_MODEL)
+        return summaries
+    
+    async def _summarize_batch(self, documents: List[Tuple[str, str]]) -> List[Tuple[str, bool]]:
+        """
+        One generateContent call asking for a JSON list of summaries, one per
+        document. Each entry is (text, whether Gemini actually produced it).
+        """
+        filenames = [filename for _, filename in documents]
         try:
-            logger.info(f"📄 Summarizing document: {filename}")
+            logger.info("📄 Summarizing %s document(s): %s", len(documents), ', '.join(filenames))
             
             if not self.google_api_key:
                 raise ValueError("Google API key not configured")
             
-            prompt = f"""Please provide a comprehensive summary of this document:
-
-**Document:** {filename}
-
-**Content:**
-{document_content[:4000]}  # Limit content to avoid token limits
+            document_sections = "\n\n".join(
+                f"DOC {number}\n**Document:** {filename}\n\n**Content:**\n{self._truncate_text(content, self.SUMMARY_MAX_CHARS)}"
+                for number, (content, filename) in enumerate(documents, 1)
+            )
+            
+            prompt = f"""Please provide a comprehensive summary of each of the documents below.
 
-Please summarize:
+For each document, summarize:
 1. Main topics and themes
 2. Key points and findings
 3. Important details
 4. Overall purpose/conclusion
 
-Keep the summary detailed but concise."""
+Keep each summary detailed but concise.
+
+Return JSON: {{"summaries": [{{"doc": <DOC number>, "summary": "..."}}]}}
+
+{document_sections}"""
             
             payload = {
                 "contents": [
@@ -141,31 +632,35 @@ Keep the summary detailed but concise."""
                     "temperature": 0.3,  # Lower temperature for more factual summaries
                     "topK": 40,
                     "topP": 0.95,
-                    "maxOutputTokens": 1024,
+                    "maxOutputTokens": 1024 * len(documents),
+                    "responseMimeType": "application/json",
                 }
             }
             
-            response = await self._call_gemini_api('models/gemini-1.5-flash:generateContent', payload)
+            response = await self._call_gemini_api(f'{self.SUMMARY_MODEL}:generateContent', payload)
             
             candidates = response.get('candidates', [])
-            if not candidates:
-                return f"Summary: {filename} - Content analysis not available"
-            
-            candidate = candidates[0]
-            content = candidate.get('content', {})
-            parts = content.get('parts', [])
-            
-            if not parts:
-                return f"Summary: {filename} - Content analysis not available"
+            parts = candidates[0].get('content', {}).get('parts', []) if candidates else []
+            text = parts[0].get('text', '') if parts else ''
             
-            summary = parts[0].get('text', '')
+            summaries = {}
+            if text:
+                for item in orjson.loads(text).get('summaries', []):
+                    try:
+                        summaries[int(item.get('doc'))] = item.get('summary')
+                    except (TypeError, ValueError):
+                        continue
             
-            logger.info(f"✅ Generated summary for {filename}")
-            return summary
+            logger.info("✅ Generated %s summaries for %s document(s)", len(summaries), len(documents))
+            return [
+                (summaries[number], True) if summaries.get(number)
+                else (f"Summary: {filename} - Content analysis not available", False)
+                for number, filename in enumerate(filenames, 1)
+            ]
             
         except Exception as error:
-            logger.error(f"❌ Error summarizing document {filename}: {error}")
-            return f"Summary: {filename} - Error generating summary: {str(error)}"
+            logger.error("❌ Error summarizing documents %s: %s", ', '.join(filenames), error)
+            return [(f"Summary: {filename} - Error generating summary: {str(error)}", False) for filename in filenames]
     
     async def _call_gemini_api(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -174,49 +669,128 @@ Keep the summary detailed but concise."""
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            response = await self.client.post(
-                url,
-                json=payload,
-                params={"key": self.google_api_key}
-            )
+            async with self.gemini_semaphore:
+                self.in_flight += 1
+                try:
+                    response = await self.client.post(
+                        url,
+                        content=_encode_payload(payload),
+                        headers=JSON_HEADERS,
+                        params={"key": self.google_api_key}
+                    )
+                finally:
+                    self.in_flight -= 1
             
             if response.status_code != 200:
                 error_detail = response.text
-                logger.error(f"❌ Gemini API error: {response.status_code} - {error_detail}")
+                logger.error("❌ Gemini API error: %s - %s", response.status_code, error_detail)
                 raise ValueError(f"Gemini API error: {response.status_code}")
             
-            return response.json()
+            return orjson.loads(response.content)
             
         except httpx.RequestError as e:
-            logger.error(f"❌ HTTP request error: {e}")
+            logger.error("❌ HTTP request error: %s", e)
             raise ValueError(f"Request failed: {str(e)}")
         except Exception as e:
-            logger.error(f"❌ Unexpected error calling Gemini API: {e}")
+            logger.error("❌ Unexpected error calling Gemini API: %s", e)
             raise ValueError(f"API call failed: {str(e)}")
     
+    async def _stream_gemini_api(self, endpoint: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Make a streaming request to Gemini API and yield each JSON chunk
+        from its server-sent events.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        
+        try:
+            # The slot is held for the whole stream since the upstream request is open until it ends
+            async with self.gemini_semaphore:
+                self.in_flight += 1
+                try:
+                    async with self.client.stream(
+                        "POST",
+                        url,
+                        content=_encode_payload(payload),
+                        headers=JSON_HEADERS,
+                        params={"key": self.google_api_key, "alt": "sse"}
+                    ) as response:
+                        if response.status_code != 200:
+                            error_detail = (await response.aread()).decode(errors="replace")
+                            logger.error("❌ Gemini API error: %s - %s", response.status_code, error_detail)
+                            raise ValueError(f"Gemini API error: {response.status_code}")
+                        
+                        async for line in response.aiter_lines():
+                            if line.startswith("data:"):
+                                yield orjson.loads(line[5:])
+                finally:
+                    self.in_flight -= 1
+                        
+        except httpx.RequestError as e:
+            logger.error("❌ HTTP request error: %s", e)
+            raise ValueError(f"Request failed: {str(e)}")
+    
+    def _document_previews(self, documents: List[Dict[str, Any]]) -> List[Tuple[str, str, str]]:
+        """(name, type, leading text) of each document with any text, read once per request"""
+        previews = []
+        for doc in documents:
+            doc_content = doc.get('extracted_text') or doc.get('content', '')
+            if doc_content:
+                previews.append((
+                    doc.get('name', 'Unknown'),
+                    doc.get('type', 'Unknown'),
+                    doc_content[:self.DOCUMENT_CONTEXT_CHARS]  # Limit content length
+                ))
+        return previews
+    
     def _build_contact_context(self, contact: Dict[str, Any], documents: List[Dict[str, Any]]) -> str:
+        """
+        Context string for a contact and its documents. A conversation sends the
+        same contact and documents on every turn; the persona and each
+        document's block are cached by their own values (_persona,
+        _document_block), so a turn only joins ready-made pieces and an
+        edited document changes its key, so nothing needs invalidating.
+        
+        Documents are ordered by id so the same set always renders to the same
+        bytes, whatever order the caller fetched them in.
+        """
+        documents = sorted(documents, key=lambda doc: str(doc.get('id', '')))
+        persona = (contact.get('name', 'AI Assistant'), contact.get('description', 'You are a helpful AI assistant.'))
+        return self._render_contact_context(persona, self._document_previews(documents), bool(documents))
+    
+    def _render_contact_context(self, persona: Tuple[str, str], previews: List[Tuple[str, str, str]], has_documents: bool) -> str:
         """
         Build context string from contact information and documents.
         """
-        context = f"You are {contact.get('name', 'AI Assistant')}. {contact.get('description', 'You are a helpful AI assistant.')}"
+        context = self._persona(*persona)
         
         # Add documents to context if available
-        if documents:
-            context += "\n\n=== YOUR KNOWLEDGE BASE ===\n"
-            context += "You have access to the following documents. Use this information to provide accurate and detailed responses:\n\n"
-            
-            for doc in documents:
-                # Format document for AI consumption (simplified version)
-                doc_content = doc.get('extracted_text') or doc.get('content', '')
-                if doc_content:
-                    context += f"📄 DOCUMENT: {doc.get('name', 'Unknown')}\n"
-                    context += f"📋 Type: {doc.get('type', 'Unknown')}\n"
-                    context += f"📖 CONTENT:\n{doc_content[:2000]}...\n\n"  # Limit content length
-            
-            context += "This is your knowledge base. Reference this information throughout conversations to provide accurate responses."
+        if has_documents:
+            context = "".join([
+                context,
+                "\n\n=== YOUR KNOWLEDGE BASE ===\n",
+                "You have access to the following documents. Use this information to provide accurate and detailed responses:\n\n",
+                *(self._document_block(*preview) for preview in previews),
+                "This is your knowledge base. Reference this information throughout conversations to provide accurate responses.",
+            ])
         
         return context
     
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _persona(name: str, description: str) -> str:
+        """Opening of the system prompt for a contact; cached since a contact's persona rarely changes"""
+        return f"{STATIC_TOOL_PREAMBLE}\n\nYou are {name}. {description}"
+    
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _document_block(name: str, doc_type: str, preview: str) -> str:
+        """
+        One document's section of the knowledge base. Cached per document, so
+        when a conversation's document set changes only the new documents are
+        formatted again.
+        """
+        return f"📄 DOCUMENT: {name}\n📋 Type: {doc_type}\n📖 CONTENT:\n{preview}...\n\n"
+    
     def _build_conversation_history(self, chat_history: List[Dict[str, Any]], contact_name: str) -> str:
         """
         Build conversation history string from chat messages.
@@ -224,21 +798,14 @@ Keep the summary detailed but concise."""
         if not chat_history:
             return ""
         
-        # Take last 10 messages to avoid token limits
-        recent_history = chat_history[-10:]
-        
-        formatted_history = []
-        for message in recent_history:
-            sender = message.get('sender', 'unknown')
-            content = message.get('content', '')
-            
-            if sender == 'user':
-                formatted_history.append(f"User: {content}")
-            else:
-                formatted_history.append(f"{contact_name}: {content}")
-        
-        return '\n'.join(formatted_history)
+        # Take the last few messages to avoid token limits
+        user_prefix, contact_prefix = "User: ", f"{contact_name}: "
+        return '\n'.join(
+            (user_prefix if is_user else contact_prefix) + str(content)
+            for is_user, content in self._window_messages(chat_history)
+        )
     
+    @async_ttl_cache(settings.HEALTH_CACHE_TTL)
     async def health_check(self) -> Dict[str, Any]:
         """
         Check if AI service is healthy and can connect to Gemini API.
@@ -283,88 +850,79 @@ Keep the summary detailed but concise."""
                 }
                 
         except Exception as e:
-            logger.error(f"❌ AI service health check failed: {e}")
+            logger.error("❌ AI service health check failed: %s", e)
             return {
                 "status": "unhealthy",
                 "error": str(e)
             }
     
-    def _get_function_declarations(self) -> List[Dict[str, Any]]:
-        """Get function declarations for chat integration support"""
-        return [
-            {
-                "name": "search_web",
-                "description": "Search the web for current information, news, facts, or real-time data using Tavily AI search engine. Use when users ask to search, look up, google, find information, or get current/recent data about anything.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "The search query - what to search for on the web"
-                        },
-                        "searchDepth": {
-                            "type": "string",
-                            "description": "Search depth for better results",
-                            "enum": ["basic", "advanced"],
-                            "default": "basic"
-                        },
-                        "maxResults": {
-                            "type": "integer",
-                            "description": "Maximum number of search results to return (1-20)",
-                            "default": 5
-                        }
-                    },
-                    "required": ["query"]
-                }
-            },
-            {
-                "name": "scrape_website",
-                "description": "Extract content from websites when users ask to scrape, crawl, or get content from specific URLs. Use when user asks to go to a website and get its content.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The URL to scrape content from"
-                        },
-                        "extractType": {
-                            "type": "string",
-                            "description": "Type of content to extract",
-                            "enum": ["text", "markdown", "html"],
-                            "default": "markdown"
-                        },
-                        "includeImages": {
-                            "type": "boolean",
-                            "description": "Whether to include images",
-                            "default": False
-                        }
-                    },
-                    "required": ["url"]
-                }
-            }
-        ]
+    def concurrency_stats(self) -> Dict[str, int]:
+        """Current upstream Gemini load against the configured cap"""
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency
+        }
     
-    def _build_conversation_contents(self, chat_history: List[Dict[str, Any]], user_message: str, contact_name: str) -> List[Dict[str, Any]]:
-        """Build conversation contents for Gemini API function calling format"""
-        contents = []
+    def _window_messages(self, chat_history: List[Dict[str, Any]]) -> List[Tuple[bool, Any]]:
+        """
+        (is_user, content) of the most recent messages fitting in
+        HISTORY_TOKEN_BUDGET, at ~4 characters per token, oldest first. The
+        cut is then moved forward to a multiple of HISTORY_WINDOW_STEP
+        messages from the start of the chat, so it stays put for several
+        turns and the request prefix Gemini may have cached keeps matching;
+        if that would leave no history at all, the unsnapped window is used.
         
-        # Add recent chat history
-        recent_history = chat_history[-10:] if chat_history else []
+        Each message's fields are read once here, and only for the messages
+        that are examined. A message longer than HISTORY_MESSAGE_MAX_CHARS
+        (a pasted log file, say) is truncated, so one huge message can't
+        dominate the prompt or the memory of every copy made of it. A message
+        that still doesn't fit what is left of the budget is cut down to the
+        remainder, or skipped when too little is left, and older messages are
+        still considered.
+        """
+        if not chat_history:
+            return []
         
-        for message in recent_history:
-            sender = message.get('sender', 'unknown')
+        turns = []  # (index in chat_history, is_user, content), newest first
+        chars_left = self.HISTORY_TOKEN_BUDGET * 4
+        max_chars = self.HISTORY_MESSAGE_MAX_CHARS
+        min_chars = self.HISTORY_MESSAGE_MIN_CHARS
+        for index in range(len(chat_history) - 1, -1, -1):
+            if chars_left < min_chars:
+                break
+            message = chat_history[index]
             content = message.get('content', '')
-            
-            if sender == 'user':
-                contents.append({
-                    "role": "user",
-                    "parts": [{"text": content}]
-                })
-            else:
-                contents.append({
-                    "role": "model", 
-                    "parts": [{"text": content}]
-                })
+            limit = min(max_chars, chars_left - 4)
+            if len(str(content)) > limit:
+                if not isinstance(content, str) or limit < min_chars:
+                    continue
+                content = self._truncate_text(content, limit - 24) + "\n[... truncated ...]"
+            chars_left -= len(str(content)) + 4
+            turns.append((index, message.get('sender') == 'user', content))
+        turns.reverse()
+        
+        if turns and turns[0][0]:
+            step = self.HISTORY_WINDOW_STEP
+            cut = -(-turns[0][0] // step) * step
+            snapped = [turn for turn in turns if turn[0] >= cut]
+            if snapped:
+                turns = snapped
+        return [(is_user, content) for _, is_user, content in turns]
+    
+    def _build_conversation_contents(self, chat_history: List[Dict[str, Any]], user_message: str, contact_name: str) -> List[Dict[str, Any]]:
+        """Build conversation contents for Gemini API function calling format"""
+        # Turns stay plain dicts rather than pre-serialized JSON: tool calls
+        # append to this list, the follow-up request resends it, and the
+        # request hash and semantic cache read it back. _encode_payload
+        # serializes the list in one orjson call.
+        # Add recent chat history
+        contents = [
+            {
+                "role": "user" if is_user else "model",
+                "parts": [{"text": content}]
+            }
+            for is_user, content in self._window_messages(chat_history)
+        ]
         
         # Add current user message
         contents.append({
@@ -374,6 +932,72 @@ Keep the summary detailed but concise."""
         
         return contents
     
+    async def _dispatch_function(self, function_call: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one tool call; failures become an error response for the model instead of raising"""
+        function_name = function_call.get('name')
+        function_args = function_call.get('args', {})
+        
+        logger.info("🔧 Executing function: %s", function_name)
+        
+        try:
+            if function_name == "search_web":
+                result = await integrations_service.execute_web_search_tool(
+                    query=function_args.get('query'),
+                    search_depth=function_args.get('searchDepth', 'basic'),
+                    max_results=function_args.get('maxResults', 5),
+                    include_answer=True
+                )
+            elif function_name == "scrape_website":
+                result = await integrations_service.execute_firecrawl_tool_operation(
+                    url=function_args.get('url'),
+                    extract_type=function_args.get('extractType', 'markdown'),
+                    include_images=function_args.get('includeImages', False),
+                    max_pages=5
+                )
+            else:
+                result = {"success": False, "error": f"Unknown function: {function_name}"}
+        except Exception as e:
+            logger.error("❌ Function %s failed: %s", function_name, e)
+            result = {"success": False, "error": str(e)}
+        
+        return {"name": function_name, "response": result}
+    
+    async def _run_function_calls(self, function_calls: List[Dict[str, Any]], conversation_contents: List[Dict[str, Any]]):
+        """Run a model turn's function calls and append the call and its results to the conversation"""
+        logger.info("🔧 Executing %s function call(s)", len(function_calls))
+        
+        # Add the model's function call to conversation
+        conversation_contents.append({
+            "role": "model",
+            "parts": [{"functionCall": fc} for fc in function_calls]
+        })
+        
+        # Calls in one turn are independent, so run them concurrently;
+        # gather keeps the order Gemini asked for them in
+        function_responses = await asyncio.gather(
+            *[self._dispatch_function(function_call) for function_call in function_calls]
+        )
+        
+        # Add function responses to conversation
+        conversation_contents.append({
+            "role": "function",
+            "parts": [{"functionResponse": {
+                "name": fr["name"],
+                "response": fr["response"]
+            }} for fr in function_responses]
+        })
+    
+    @staticmethod
+    def _follow_up_payload(payload: Dict[str, Any], conversation_contents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Payload for the turn after tool calls. Gemini keeps no state between
+        requests, so the persona and tools still have to be sent; when the
+        first request referenced a cachedContents entry that reference is all
+        the follow-up carries too. Everything but the contents is shared with
+        the first payload, never copied.
+        """
+        return {**payload, "contents": conversation_contents}
+    
     async def _handle_function_calling_response(self, response: Dict[str, Any], conversation_contents: List[Dict[str, Any]], original_payload: Dict[str, Any], contact: Dict[str, Any]) -> str:
         """Handle Gemini API response with function calling"""
         try:
@@ -388,112 +1012,67 @@ Keep the summary detailed but concise."""
             if not parts:
                 raise ValueError('No content parts in Gemini API response')
             
-            # Check if there's a function call
-            function_calls = []
-            text_response = ""
+            # Most turns are plain text: return it without collecting calls
+            if not any('functionCall' in part for part in parts):
+                text_response = "".join([part['text'] for part in parts if 'text' in part])
+                if not text_response:
+                    raise ValueError('Empty response from Gemini API')
+                logger.info("✅ Generated response (%s characters)", len(text_response))
+                return text_response
             
-            for part in parts:
-                if 'functionCall' in part:
-                    function_calls.append(part['functionCall'])
-                elif 'text' in part:
-                    text_response += part['text']
+            # Otherwise execute the function calls
+            function_calls = [part['functionCall'] for part in parts if 'functionCall' in part]
+            await self._run_function_calls(function_calls, conversation_contents)
             
-            # If there are function calls, execute them
-            if function_calls:
-                logger.info(f"🔧 Executing {len(function_calls)} function call(s)")
-                
-                # Add the model's function call to conversation
-                conversation_contents.append({
-                    "role": "model",
-                    "parts": [{"functionCall": fc} for fc in function_calls]
-                })
-                
-                # Execute function calls and add responses
-                function_responses = []
-                for function_call in function_calls:
-                    function_name = function_call.get('name')
-                    function_args = function_call.get('args', {})
-                    
-                    logger.info(f"🔧 Executing function: {function_name}")
-                    
-                    try:
-                        if function_name == "search_web":
-                            result = await integrations_service.execute_web_search_tool(
-                                query=function_args.get('query'),
-                                search_depth=function_args.get('searchDepth', 'basic'),
-                                max_results=function_args.get('maxResults', 5),
-                                include_answer=True
-                            )
-                        elif function_name == "scrape_website":
-                            result = await integrations_service.execute_firecrawl_tool_operation(
-                                url=function_args.get('url'),
-                                extract_type=function_args.get('extractType', 'markdown'),
-                                include_images=function_args.get('includeImages', False),
-                                max_pages=5
-                            )
-                        else:
-                            result = {"success": False, "error": f"Unknown function: {function_name}"}
-                        
-                        function_responses.append({
-                            "name": function_name,
-                            "response": result
-                        })
-                        
-                    except Exception as e:
-                        logger.error(f"❌ Function {function_name} failed: {e}")
-                        function_responses.append({
-                            "name": function_name,
-                            "response": {"success": False, "error": str(e)}
-                        })
-                
-                # Add function responses to conversation
-                conversation_contents.append({
-                    "role": "function",
-                    "parts": [{"functionResponse": {
-                        "name": fr["name"],
-                        "response": fr["response"]
-                    }} for fr in function_responses]
-                })
-                
-                # Make follow-up request to get final response
-                follow_up_payload = original_payload.copy()
-                follow_up_payload["contents"] = conversation_contents
-                
-                follow_up_response = await self._call_gemini_api('models/gemini-1.5-flash:generateContent', follow_up_payload)
+            # Make follow-up request to get final response
+            follow_up_payload = self._follow_up_payload(original_payload, conversation_contents)
+            
+            follow_up_response = await self._call_gemini_api(f'{self.CHAT_MODEL}:generateContent', follow_up_payload)
+            
+            # Extract final response
+            follow_up_candidates = follow_up_response.get('candidates', [])
+            if follow_up_candidates:
+                follow_up_content = follow_up_candidates[0].get('content', {})
+                follow_up_parts = follow_up_content.get('parts', [])
                 
-                # Extract final response
-                follow_up_candidates = follow_up_response.get('candidates', [])
-                if follow_up_candidates:
-                    follow_up_content = follow_up_candidates[0].get('content', {})
-                    follow_up_parts = follow_up_content.get('parts', [])
-                    
-                    final_text = ""
-                    for part in follow_up_parts:
-                        if 'text' in part:
-                            final_text += part['text']
-                    
-                    if final_text:
-                        logger.info(f"✅ Generated response with function calls ({len(final_text)} characters)")
-                        return final_text
+                final_text = "".join([part['text'] for part in follow_up_parts if 'text' in part])
                 
-                # Fallback if follow-up fails
-                return "I executed the requested function but couldn't generate a proper response. Please try again."
+                if final_text:
+                    logger.info("✅ Generated response with function calls (%s characters)", len(final_text))
+                    return final_text
             
-            else:
-                # No function calls, return text response
-                if text_response:
-                    logger.info(f"✅ Generated response ({len(text_response)} characters)")
-                    return text_response
-                else:
-                    raise ValueError('Empty response from Gemini API')
+            # Fallback if follow-up fails
+            return "I executed the requested function but couldn't generate a proper response. Please try again."
         
         except Exception as e:
-            logger.error(f"❌ Error handling function calling response: {e}")
+            logger.error("❌ Error handling function calling response: %s", e)
             raise
     
+    async def warm_up(self):
+        """
+        Open a connection to the Gemini API ahead of the first real request,
+        so the first chat turn doesn't pay for the TCP + TLS handshake.
+        Best effort: a failure here is only logged.
+        """
+        if not self.google_api_key:
+            return
+        try:
+            await self.client.get(
+                f"{self.base_url}/models",
+                params={"key": self.google_api_key, "pageSize": 1},
+                timeout=5.0
+            )
+            logger.info("🔥 Gemini connection pool warmed")
+        except httpx.HTTPError as e:
+            logger.warning("⚠️ Could not warm Gemini connection pool: %s", e)
+    
     async def close(self):
         """Close HTTP client connections."""
-        await self.client.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.summary_cache is not None:
+            await self.summary_cache.close()
 
 # Create singleton instance
-ai_service = AIService()
\ No newline at end of file
+ai_service = AIService()
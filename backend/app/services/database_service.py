@@ -1,6 +1,16 @@
-from typing import List, Dict, Any, Optional
-from supabase import create_client
+from typing import List, Dict, Any, Awaitable, Callable, Optional, Tuple
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, defaultdict
+from operator import itemgetter
+from uuid import uuid4
+from jose import JWTError, jwt
+from postgrest.types import ReturnMethod
+from supabase import Client, ClientOptions, create_client
 from ..core.config import settings
+from ..utils.cache import async_ttl_cache
+from ..utils.supabase_utils import execute
 from ..models.database import (
     AgentCreate, AgentUpdate, AgentResponse,
     IntegrationCreate, IntegrationResponse,
@@ -9,27 +19,248 @@ from ..models.database import (
     AgentContextResponse
 )
 import logging
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Columns the frontend document shape is built from. The light set leaves
+# out the text columns, which can be megabytes, for callers that only list.
+_DOC_COLS_FULL = "id,name,file_type,file_size,uploaded_at,content,summary,extracted_text,metadata"
+_DOC_COLS_LIGHT = "id,name,file_type,file_size,uploaded_at,summary,metadata"
+if settings.DOCUMENT_STORAGE_BUCKET:
+    # Bodies offloaded to storage are referenced by key, not loaded, on listings
+    _DOC_COLS_FULL += ",content_object_key"
+    _DOC_COLS_LIGHT += ",content_object_key"
+
+# Reads every column _to_frontend_doc needs in one call
+_DOC_FIELDS = itemgetter("id", "name", "file_type", "file_size", "uploaded_at", "content", "summary", "extracted_text", "metadata")
+_DOC_FIELDS_LIGHT = itemgetter("id", "name", "file_type", "file_size", "uploaded_at", "summary", "metadata")
+
+def _content_ref(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    contentObjectKey for a row whose body is in storage and wasn't loaded:
+    its content is empty here, and GET /database/documents/{id} returns it.
+    """
+    key = doc.get("content_object_key")
+    return {"contentObjectKey": key} if key and not doc.get("content") else {}
+
+def _to_frontend_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """An agent_documents row in the shape the frontend uses"""
+    doc_id, name, file_type, file_size, uploaded_at, content, summary, extracted_text, metadata = _DOC_FIELDS(doc)
+    return {
+        "id": doc_id,
+        "name": name,
+        "type": file_type,
+        "size": file_size,
+        "uploadedAt": uploaded_at,
+        "content": content or "",
+        "summary": summary,
+        "extractedText": extracted_text,
+        "metadata": metadata or {},
+        **_content_ref(doc)
+    }
+
+def _to_frontend_doc_light(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Like _to_frontend_doc, for rows selected with _DOC_COLS_LIGHT; text fields are empty"""
+    doc_id, name, file_type, file_size, uploaded_at, summary, metadata = _DOC_FIELDS_LIGHT(doc)
+    return {
+        "id": doc_id,
+        "name": name,
+        "type": file_type,
+        "size": file_size,
+        "uploadedAt": uploaded_at,
+        "content": "",
+        "summary": summary,
+        "extractedText": "",
+        "metadata": metadata or {},
+        **_content_ref(doc)
+    }
+
 class DatabaseService:
+    USER_CLIENT_CACHE_SIZE = 256  # Per-token clients kept, least recently used evicted
+    READ_CACHE_SIZE = 2048  # Cached read results, least recently used evicted
+    STORAGE_DOWNLOAD_CONCURRENCY = 8  # Offloaded document bodies downloaded at once
+    
     def __init__(self):
         # Initialize with service role key for admin operations
         self.service_role_key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_ANON_KEY
         self.admin_supabase = create_client(settings.SUPABASE_URL, self.service_role_key)
+        # blake2b(token) -> (token exp, client), least recently used first
+        self._user_clients: "OrderedDict[str, Tuple[float, Client]]" = OrderedDict()
+        # (kind, id, caller, variant) -> (expires_at, result) for the hot read paths
+        self._read_cache: "OrderedDict[Tuple[str, str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._read_generation = 0  # Bumped by every invalidation
+        self._download_slots = asyncio.Semaphore(self.STORAGE_DOWNLOAD_CONCURRENCY)
         logger.info(f"🔧 Database service initialized with {'service role' if settings.SUPABASE_SERVICE_ROLE_KEY else 'anon'} key")
     
-    def get_user_client(self, user_token: str):
-        """Get a Supabase client for a specific user using their JWT token"""
-        from supabase import ClientOptions
+    def get_user_client(self, user_token: str) -> Client:
+        """
+        Get a Supabase client for a specific user using their JWT token.
+        
+        Building a client sets up its HTTP sessions, so one is kept per token
+        and reused until the token expires. Nothing here awaits, so concurrent
+        requests can't race on the cache.
+        
+        Clients deliberately don't share one injected httpx client: postgrest
+        writes its base URL and headers, including this user's Authorization,
+        onto the client it is handed, so a shared one would carry the last
+        user's token into every other user's requests.
+        """
+        key = hashlib.blake2b(user_token.encode(), digest_size=16).hexdigest()
+        entry = self._user_clients.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._user_clients.move_to_end(key)
+                return entry[1]
+            del self._user_clients[key]
         
         # Create client options with the user's JWT token
         options = ClientOptions()
         options.headers = {'Authorization': f'Bearer {user_token}'}
+        client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY, options)
         
-        return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY, options)
+        try:
+            expires_at = jwt.get_unverified_claims(user_token).get("exp")
+        except JWTError:
+            expires_at = None
+        if expires_at is not None:
+            # Tokens without a readable exp aren't cached
+            self._user_clients[key] = (expires_at, client)
+            if len(self._user_clients) > self.USER_CLIENT_CACHE_SIZE:
+                self._user_clients.popitem(last=False)
+        return client
+
+    async def _cached(self, kind: str, key: str, user_token: Optional[str], fetch: Callable[[], Awaitable[Any]], variant: str = "") -> Any:
+        """
+        Result of fetch(), reused for DB_CACHE_TTL seconds. Rows depend on who
+        asks (RLS), so the caller's token is part of the key. Writes call
+        _invalidate; a result fetched while a write landed isn't stored, so
+        it can't outlive the invalidation. Errors propagate and aren't cached.
+        Other worker processes don't see invalidations, so they may serve a
+        result up to DB_CACHE_TTL old. `variant` tells apart different
+        shapes of the same read; invalidation drops all of them.
+        """
+        caller = hashlib.blake2b(user_token.encode(), digest_size=8).hexdigest() if user_token else ""
+        cache_key = (kind, key, caller, variant)
+        entry = self._read_cache.get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._read_cache.move_to_end(cache_key)
+            return entry[1]
+        
+        generation = self._read_generation
+        value = await fetch()
+        if generation == self._read_generation:
+            self._read_cache[cache_key] = (time.monotonic() + settings.DB_CACHE_TTL, value)
+            self._read_cache.move_to_end(cache_key)
+            if len(self._read_cache) > self.READ_CACHE_SIZE:
+                self._read_cache.popitem(last=False)
+        return value
+    
+    def _invalidate(self, *kinds: str, key: Optional[str] = None):
+        """Drop cached reads of these kinds, only for `key` if given, for every caller"""
+        self._read_generation += 1
+        for cache_key in [k for k in self._read_cache if k[0] in kinds and (key is None or k[1] == key)]:
+            del self._read_cache[cache_key]
+
+    async def _insert_one(self, client: Client, table: str, row: Dict[str, Any], what: str) -> Dict[str, Any]:
+        """Insert one row and return it as stored, via PostgREST's RETURNING representation"""
+        try:
+            result = await execute(client.from_(table).insert(row, returning=ReturnMethod.representation), attempts=1)
+        except Exception:
+            # A failing write shouldn't keep reporting a cached healthy result
+            self.test_connection.cache_clear()
+            raise
+        if not result.data:
+            raise Exception(f"Failed to {what}")
+        return result.data[0]
+
+    async def _delete_by_id(self, client: Client, table: str, row_id: str):
+        """Delete one row by id; Prefer: return=minimal so PostgREST sends back an empty body"""
+        try:
+            await execute(client.from_(table).delete(returning=ReturnMethod.minimal).eq('id', row_id))
+        except Exception:
+            self.test_connection.cache_clear()
+            raise
+
+    async def _offload_content(self, agent_id: str, document_dict: Dict[str, Any]) -> Optional[str]:
+        """
+        With DOCUMENT_STORAGE_BUCKET set, move a large document body into
+        storage and keep only its object key in the row. extracted_text is
+        usually the same text, so it is dropped too when identical. Listings
+        only return the key; get_document_by_id and get_all_agent_context
+        load the body back through _load_offloaded_content. Returns the
+        object key, or None when the body stays inline.
+        """
+        content = document_dict.get("content") or ""
+        if not settings.DOCUMENT_STORAGE_BUCKET or len(content) < settings.DOCUMENT_STORAGE_MIN_CHARS:
+            return None
+        
+        # Stored with the service role; the row itself is still inserted under the caller's RLS
+        key = f"{agent_id}/{uuid4().hex}.txt"
+        bucket = self.admin_supabase.storage.from_(settings.DOCUMENT_STORAGE_BUCKET)
+        await asyncio.to_thread(bucket.upload, key, content.encode("utf-8"), {"content-type": "text/plain; charset=utf-8"})
+        
+        if document_dict.get("extracted_text") == content:
+            document_dict["extracted_text"] = ""
+        document_dict["content"] = ""
+        document_dict["content_object_key"] = key
+        return key
+    
+    async def _load_offloaded_content(self, rows: List[Dict[str, Any]]):
+        """
+        Download the bodies of rows whose content is in storage into the rows,
+        at most STORAGE_DOWNLOAD_CONCURRENCY at a time across the process so a
+        large library can't take over the blocking-I/O threads.
+        """
+        offloaded = [row for row in rows if row.get("content_object_key")]
+        if not offloaded:
+            return
+        
+        bucket = self.admin_supabase.storage.from_(settings.DOCUMENT_STORAGE_BUCKET)
+        
+        async def download(key: str) -> bytes:
+            async with self._download_slots:
+                return await asyncio.to_thread(bucket.download, key)
+        
+        bodies = await asyncio.gather(
+            *(download(row["content_object_key"]) for row in offloaded),
+            return_exceptions=True
+        )
+        for row, body in zip(offloaded, bodies):
+            if isinstance(body, Exception):
+                # One missing object shouldn't cost the caller the whole document list
+                logger.warning(f'⚠️ Could not load document content {row["content_object_key"]}: {body}')
+                continue
+            row["content"] = body.decode("utf-8")
+            if not row.get("extracted_text"):
+                row["extracted_text"] = row["content"]
+    
+    async def _offloaded_keys(self, query) -> List[str]:
+        """Storage keys of the rows `query` selects; read them before deleting the rows"""
+        if not settings.DOCUMENT_STORAGE_BUCKET:
+            return []
+        try:
+            result = await execute(query.not_.is_('content_object_key', 'null'))
+            return [row["content_object_key"] for row in result.data or []]
+        except Exception as error:
+            # Leaves orphaned objects at worst; the row delete goes ahead regardless
+            logger.warning(f'⚠️ Could not look up stored document content: {error}')
+            return []
+    
+    async def _remove_stored_content(self, keys: List[str]):
+        """
+        Remove storage objects whose rows are gone (or were never written).
+        Failures are only logged: an orphaned object is harmless, unlike a
+        row whose content has been removed from under it.
+        """
+        if not keys:
+            return
+        try:
+            bucket = self.admin_supabase.storage.from_(settings.DOCUMENT_STORAGE_BUCKET)
+            await asyncio.to_thread(bucket.remove, keys)
+        except Exception as error:
+            logger.warning(f'⚠️ Could not remove stored document content: {error}')
 
+    @async_ttl_cache(settings.HEALTH_CACHE_TTL)
     async def test_connection(self) -> bool:
         """Test database connection"""
         try:
@@ -38,13 +269,13 @@ class DatabaseService:
             # Use admin client for health check
             try:
                 # This is a simple way to test the connection without hitting RLS
-                result = self.admin_supabase.rpc('version').execute()
+                result = await execute(self.admin_supabase.rpc('version'))
                 logger.info('✅ Database connection test successful')
                 return True
             except Exception as rpc_error:
                 logger.info(f'RPC version failed, trying basic query: {rpc_error}')
                 # Fallback: try a simple query that should work with service role
-                result = self.admin_supabase.from_('user_profiles').select('id').limit(1).execute()
+                result = await execute(self.admin_supabase.from_('user_profiles').select('id').limit(1))
                 if result is not None:  # Even if result.data is empty, connection works
                     logger.info('✅ Database connection test successful (fallback)')
                     return True
@@ -66,44 +297,60 @@ class DatabaseService:
         try:
             logger.info(f'📊 Fetching user agents for: {user_id}')
             
-            # Use user client if token provided, otherwise use admin client
-            supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
-            
-            result = supabase_client.from_('user_agents').select("""
-                *,
-                agent_integrations (
-                    id,
-                    template_id,
-                    name,
-                    description,
-                    config,
-                    status
-                ),
-                agent_documents (
-                    id,
-                    name,
-                    original_filename,
-                    file_type,
-                    file_size,
-                    content,
-                    summary,
-                    extracted_text,
-                    metadata,
-                    uploaded_at
-                )
-            """).eq('user_id', user_id).order('created_at', desc=True).execute()
-            
-            if result.data is None:
+            agents = (await self._cached(
+                "user_agents", user_id, user_token,
+                lambda: self.get_user_agents_bulk([user_id], user_token)
+            ))[user_id]
+            if not agents:
                 logger.warning(f'No agents found for user: {user_id}')
-                return []
                 
-            logger.info(f'✅ Fetched {len(result.data)} user agents')
-            return result.data
+            logger.info(f'✅ Fetched {len(agents)} user agents')
+            return agents
             
         except Exception as error:
             logger.error(f'❌ Error fetching user agents: {error}')
             raise error
 
+    async def get_user_agents_bulk(self, user_ids: List[str], user_token: str = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Agents for several users in one query, grouped by user id. Every
+        requested id gets an entry, empty if the user has no agents.
+        """
+        # Use user client if token provided, otherwise use admin client
+        supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
+        
+        # Offloaded bodies aren't downloaded for listings; callers get the key instead
+        storage_key_column = "content_object_key," if settings.DOCUMENT_STORAGE_BUCKET else ""
+        result = await execute(supabase_client.from_('user_agents').select(f"""
+            *,
+            agent_integrations (
+                id,
+                template_id,
+                name,
+                description,
+                config,
+                status
+            ),
+            agent_documents (
+                id,
+                name,
+                original_filename,
+                file_type,
+                file_size,
+                content,
+                summary,
+                extracted_text,
+                metadata,
+                {storage_key_column}
+                uploaded_at
+            )
+        """).in_('user_id', user_ids).order('created_at', desc=True))
+        
+        agents_by_user = defaultdict(list)
+        for agent in result.data or []:
+            agents_by_user[agent["user_id"]].append(agent)
+        return {user_id: agents_by_user[user_id] for user_id in user_ids}
+
     async def create_user_agent(self, user_id: str, agent_data: AgentCreate, user_token: str = None) -> Dict[str, Any]:
         """Create a new user agent"""
         try:
@@ -117,20 +364,17 @@ class DatabaseService:
                 "color": agent_data.color,
                 "voice": agent_data.voice,
                 "avatar_url": agent_data.avatar,
-                "status": agent_data.status,
-                "last_seen": "now"
+                "status": agent_data.status
             }
             
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('user_agents').insert(agent_dict).execute()
+            row = await self._insert_one(supabase_client, 'user_agents', agent_dict, "create user agent")
+            self._invalidate("user_agents", key=user_id)
             
-            if result.data is None or len(result.data) == 0:
-                raise Exception("Failed to create user agent")
-                
-            logger.info(f'✅ Created user agent with ID: {result.data[0]["id"]}')
-            return result.data[0]
+            logger.info(f'✅ Created user agent with ID: {row["id"]}')
+            return row
             
         except Exception as error:
             logger.error(f'❌ Error creating user agent: {error}')
@@ -142,13 +386,14 @@ class DatabaseService:
             logger.info(f'📝 Updating user agent: {agent_id}')
             
             # Convert Pydantic model to dict, excluding None values
+            # updated_at is set by the update_user_agents_updated_at trigger
             update_data = updates.model_dump(exclude_none=True)
-            update_data['updated_at'] = datetime.now().isoformat()
             
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('user_agents').update(update_data).eq('id', agent_id).execute()
+            result = await execute(supabase_client.from_('user_agents').update(update_data).eq('id', agent_id))
+            self._invalidate("user_agents")
             
             if result.data is None or len(result.data) == 0:
                 raise Exception(f"Agent {agent_id} not found or update failed")
@@ -158,6 +403,8 @@ class DatabaseService:
             
         except Exception as error:
             logger.error(f'❌ Error updating user agent: {error}')
+            # Like _insert_one: a failing write shouldn't keep reporting a cached healthy result
+            self.test_connection.cache_clear()
             raise error
 
     async def delete_user_agent(self, agent_id: str, user_token: str = None) -> bool:
@@ -168,7 +415,12 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            supabase_client.from_('user_agents').delete().eq('id', agent_id).execute()
+            # The agent's documents go with it (ON DELETE CASCADE), so their stored bodies go too
+            stored_keys = await self._offloaded_keys(supabase_client.from_('agent_documents').select('content_object_key').eq('agent_id', agent_id))
+            await self._delete_by_id(supabase_client, 'user_agents', agent_id)
+            await self._remove_stored_content(stored_keys)
+            self._invalidate("user_agents")
+            self._invalidate("agent_documents", "conversation_documents", "agent_context", key=agent_id)
             
             logger.info('✅ Deleted user agent')
             return True
@@ -195,13 +447,11 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('agent_integrations').insert(integration_dict).execute()
+            row = await self._insert_one(supabase_client, 'agent_integrations', integration_dict, "create agent integration")
+            self._invalidate("user_agents")
             
-            if result.data is None or len(result.data) == 0:
-                raise Exception("Failed to create agent integration")
-                
             logger.info('✅ Created agent integration')
-            return result.data[0]
+            return row
             
         except Exception as error:
             logger.error(f'❌ Error creating agent integration: {error}')
@@ -215,7 +465,8 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            supabase_client.from_('agent_integrations').delete().eq('id', integration_id).execute()
+            await self._delete_by_id(supabase_client, 'agent_integrations', integration_id)
+            self._invalidate("user_agents")
             
             logger.info('✅ Deleted agent integration')
             return True
@@ -246,13 +497,19 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('agent_documents').insert(document_dict).execute()
+            stored_key = await self._offload_content(agent_id, document_dict)
+            try:
+                row = await self._insert_one(supabase_client, 'agent_documents', document_dict, "create agent document")
+            except Exception:
+                # Don't leave the uploaded body behind without a row pointing at it
+                if stored_key:
+                    await self._remove_stored_content([stored_key])
+                raise
+            self._invalidate("user_agents")
+            self._invalidate("agent_documents", "conversation_documents", "agent_context", key=agent_id)
             
-            if result.data is None or len(result.data) == 0:
-                raise Exception("Failed to create agent document")
-                
             logger.info('✅ Created agent document')
-            return result.data[0]
+            return row
             
         except Exception as error:
             logger.error(f'❌ Error creating agent document: {error}')
@@ -266,7 +523,12 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            supabase_client.from_('agent_documents').delete().eq('id', document_id).execute()
+            stored_keys = await self._offloaded_keys(supabase_client.from_('agent_documents').select('content_object_key').eq('id', document_id))
+            await self._delete_by_id(supabase_client, 'agent_documents', document_id)
+            await self._remove_stored_content(stored_keys)
+            # The owning agent isn't known here, so every agent's document reads go
+            self._invalidate("user_agents", "agent_documents", "conversation_documents", "agent_context")
+            self._invalidate("document", key=document_id)
             
             logger.info('✅ Deleted agent document')
             return True
@@ -275,33 +537,22 @@ class DatabaseService:
             logger.error(f'❌ Error deleting agent document: {error}')
             raise error
 
-    async def get_agent_documents(self, agent_id: str, user_token: str = None) -> List[Dict[str, Any]]:
-        """Get all documents for an agent"""
+    async def get_agent_documents(self, agent_id: str, user_token: str = None, light: bool = False) -> List[Dict[str, Any]]:
+        """Get all documents for an agent; light=True skips content and extracted text"""
         try:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('agent_documents').select('*').eq('agent_id', agent_id).order('uploaded_at', desc=True).execute()
+            columns, to_frontend = (_DOC_COLS_LIGHT, _to_frontend_doc_light) if light else (_DOC_COLS_FULL, _to_frontend_doc)
             
-            if result.data is None:
-                return []
+            async def fetch():
+                # Off-loop so concurrent fetches overlap
+                result = await execute(supabase_client.from_('agent_documents').select(columns).eq('agent_id', agent_id).order('uploaded_at', desc=True))
                 
-            # Convert to frontend format
-            documents = []
-            for doc in result.data:
-                documents.append({
-                    "id": doc["id"],
-                    "name": doc["name"],
-                    "type": doc["file_type"],
-                    "size": doc["file_size"],
-                    "uploadedAt": doc["uploaded_at"],
-                    "content": doc["content"] or "",
-                    "summary": doc["summary"],
-                    "extractedText": doc["extracted_text"],
-                    "metadata": doc["metadata"] or {}
-                })
-            
-            return documents
+                # Convert to frontend format
+                return [to_frontend(doc) for doc in result.data or []]
+            
+            return await self._cached("agent_documents", agent_id, user_token, fetch, variant=columns)
             
         except Exception as error:
             logger.error(f'❌ Error fetching agent documents: {error}')
@@ -313,23 +564,12 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('agent_documents').select('*').eq('id', document_id).execute()
+            async def fetch():
+                result = await execute(supabase_client.from_('agent_documents').select(_DOC_COLS_FULL).eq('id', document_id))
+                await self._load_offloaded_content(result.data or [])
+                return _to_frontend_doc(result.data[0]) if result.data else None
             
-            if result.data is None or len(result.data) == 0:
-                return None
-                
-            doc = result.data[0]
-            return {
-                "id": doc["id"],
-                "name": doc["name"],
-                "type": doc["file_type"],
-                "size": doc["file_size"],
-                "uploadedAt": doc["uploaded_at"],
-                "content": doc["content"] or "",
-                "summary": doc["summary"],
-                "extractedText": doc["extracted_text"],
-                "metadata": doc["metadata"] or {}
-            }
+            return await self._cached("document", document_id, user_token, fetch)
             
         except Exception as error:
             logger.error(f'❌ Error fetching document: {error}')
@@ -361,60 +601,74 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('agent_documents').insert(document_dict).execute()
+            stored_key = await self._offload_content(agent_id, document_dict)
+            try:
+                row = await self._insert_one(supabase_client, 'agent_documents', document_dict, "save conversation document")
+            except Exception:
+                # Don't leave the uploaded body behind without a row pointing at it
+                if stored_key:
+                    await self._remove_stored_content([stored_key])
+                raise
+            self._invalidate("user_agents")
+            self._invalidate("agent_documents", "conversation_documents", "agent_context", key=agent_id)
             
-            if result.data is None or len(result.data) == 0:
-                raise Exception("Failed to save conversation document")
-                
             logger.info('✅ Saved conversation document')
-            return result.data[0]["id"]
+            return row["id"]
             
         except Exception as error:
             logger.error(f'❌ Error saving conversation document: {error}')
             raise error
 
-    async def get_conversation_documents(self, agent_id: str, user_token: str = None) -> List[Dict[str, Any]]:
-        """Get conversation documents for an agent"""
+    async def get_conversation_documents(self, agent_id: str, user_token: str = None, light: bool = False) -> List[Dict[str, Any]]:
+        """Get conversation documents for an agent; light=True skips content and extracted text"""
         try:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('agent_documents').select('*').eq('agent_id', agent_id).contains('metadata', {"conversation_document": True}).order('uploaded_at', desc=True).execute()
+            columns, to_frontend = (_DOC_COLS_LIGHT, _to_frontend_doc_light) if light else (_DOC_COLS_FULL, _to_frontend_doc)
             
-            if result.data is None:
-                return []
+            async def fetch():
+                result = await execute(supabase_client.from_('agent_documents').select(columns).eq('agent_id', agent_id).contains('metadata', {"conversation_document": True}).order('uploaded_at', desc=True))
                 
-            # Convert to frontend format
-            documents = []
-            for doc in result.data:
-                documents.append({
-                    "id": doc["id"],
-                    "name": doc["name"],
-                    "type": doc["file_type"],
-                    "size": doc["file_size"],
-                    "uploadedAt": doc["uploaded_at"],
-                    "content": doc["content"] or "",
-                    "summary": doc["summary"],
-                    "extractedText": doc["extracted_text"],
-                    "metadata": doc["metadata"] or {}
-                })
-            
-            return documents
+                # Convert to frontend format
+                return [to_frontend(doc) for doc in result.data or []]
+            
+            return await self._cached("conversation_documents", agent_id, user_token, fetch, variant=columns)
             
         except Exception as error:
             logger.error(f'❌ Error fetching conversation documents: {error}')
             return []
 
+    async def _fetch_all_docs(self, agent_id: str, user_token: str = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        All of an agent's documents in one query, split into permanent and
+        conversation documents by their metadata flag. Both lists keep the
+        newest-first order.
+        """
+        # Use user client if token provided, otherwise use admin client
+        supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
+        
+        result = await execute(supabase_client.from_('agent_documents').select(_DOC_COLS_FULL).eq('agent_id', agent_id).order('uploaded_at', desc=True))
+        await self._load_offloaded_content(result.data or [])
+        
+        permanent_docs, conversation_docs = [], []
+        for doc in result.data or []:
+            document = _to_frontend_doc(doc)
+            if document["metadata"].get("conversation_document"):
+                conversation_docs.append(document)
+            else:
+                permanent_docs.append(document)
+        return permanent_docs, conversation_docs
+    
     async def get_all_agent_context(self, agent_id: str, user_token: str = None) -> Dict[str, List[Dict[str, Any]]]:
         """Get all relevant documents for context building"""
         try:
             logger.info(f'📚 Getting all agent context for: {agent_id}')
             
-            permanent_docs = await self.get_agent_documents(agent_id, user_token)
-            conversation_docs = await self.get_conversation_documents(agent_id, user_token)
-            
-            # Filter out conversation documents from permanent documents
-            permanent_docs = [doc for doc in permanent_docs if not doc.get("metadata", {}).get("conversation_document")]
+            permanent_docs, conversation_docs = await self._cached(
+                "agent_context", agent_id, user_token,
+                lambda: self._fetch_all_docs(agent_id, user_token)
+            )
             
             logger.info(f'✅ Retrieved {len(permanent_docs)} permanent + {len(conversation_docs)} conversation documents')
             
@@ -437,12 +691,11 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('user_profiles').select('*').eq('id', user_id).execute()
+            async def fetch():
+                result = await execute(supabase_client.from_('user_profiles').select('*').eq('id', user_id))
+                return result.data[0] if result.data else None
             
-            if result.data is None or len(result.data) == 0:
-                return None
-                
-            return result.data[0]
+            return await self._cached("user_profile", user_id, user_token, fetch)
             
         except Exception as error:
             logger.error(f'❌ Error fetching user profile: {error}')
@@ -461,12 +714,10 @@ class DatabaseService:
             # Use user client if token provided, otherwise use admin client
             supabase_client = self.get_user_client(user_token) if user_token else self.admin_supabase
             
-            result = supabase_client.from_('user_profiles').insert(profile_dict).execute()
+            row = await self._insert_one(supabase_client, 'user_profiles', profile_dict, "create user profile")
+            self._invalidate("user_profile", key=user_id)
             
-            if result.data is None or len(result.data) == 0:
-                raise Exception("Failed to create user profile")
-                
-            return result.data[0]
+            return row
             
         except Exception as error:
             logger.error(f'❌ Error creating user profile: {error}')
@@ -1,6 +1,13 @@
+import asyncio
+import io
+import mmap
+import os
+import tempfile
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional, BinaryIO
+from typing import Dict, Any, List, Optional, BinaryIO, Tuple
+from io import BytesIO
 import logging
 
 # Document processing libraries
@@ -11,10 +18,13 @@ from pptx import Presentation
 import zipfile
 import xml.etree.ElementTree as ET
 
+from ..core.config import settings
+
 logger = logging.getLogger(__name__)
 
 class DocumentService:
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    INLINE_TEXT_MAX_SIZE = 64 * 1024  # In-memory text files up to this size skip the parser pool
     
     TEXT_FILE_TYPES = [
         'text/plain', 'text/csv', 'application/json', 'text/markdown',
@@ -30,34 +40,162 @@ class DocumentService:
         'application/vnd.ms-excel'  # .xls
     ]
     
+    TEXT_EXTENSIONS = (
+        'txt', 'md', 'json', 'csv', 'html', 'htm', 'js', 'ts', 'jsx', 'tsx',
+        'css', 'scss', 'sass', 'xml', 'yaml', 'yml', 'log', 'sql', 'py', 'java',
+        'cpp', 'c', 'h', 'php', 'rb', 'go', 'rs', 'sh', 'bat', 'ps1', 'r'
+    )
+    
+    BINARY_EXTENSIONS = ('pdf', 'docx', 'pptx', 'xlsx', 'xls')
+    
+    SUPPORTED_EXTENSIONS = TEXT_EXTENSIONS + BINARY_EXTENSIONS
+    
+    # Set views for the per-file membership checks
+    _TEXT_EXTENSION_SET = frozenset(TEXT_EXTENSIONS)
+    _BINARY_EXTENSION_SET = frozenset(BINARY_EXTENSIONS)
+    _TEXT_FILE_TYPE_SET = frozenset(TEXT_FILE_TYPES)
+    _BINARY_FILE_TYPE_SET = frozenset(BINARY_FILE_TYPES)
+    
+    EXTENSION_TYPES = {
+        'txt': 'text/plain',
+        'md': 'text/markdown',
+        'json': 'application/json',
+        'csv': 'text/csv',
+        'html': 'text/html',
+        'htm': 'text/html',
+        'js': 'application/javascript',
+        'ts': 'application/typescript',
+        'css': 'text/css',
+        'xml': 'application/xml',
+        'yaml': 'application/yaml',
+        'yml': 'application/yaml',
+        'pdf': 'application/pdf',
+        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'xls': 'application/vnd.ms-excel'
+    }
+    
+    # Extension -> extractor method, looked up once per binary file
+    _BINARY_EXTRACTORS = {
+        'pdf': '_extract_pdf_content',
+        'docx': '_extract_word_content',
+        'pptx': '_extract_powerpoint_content',
+        'xlsx': '_extract_excel_content',
+        'xls': '_extract_excel_content',
+    }
+    
     def __init__(self):
+        # Parsers are synchronous and CPU-bound, so they run on a dedicated
+        # bounded pool instead of blocking the event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.DOCUMENT_WORKERS,
+            thread_name_prefix="document-parser"
+        )
+        # Optional process pool for the binary parsers, created on first use
+        self.process_pool: Optional[ProcessPoolExecutor] = None
         logger.info("DocumentService initialized")
     
-    async def process_file(self, file_data: bytes, filename: str, content_type: str) -> Dict[str, Any]:
-        """Process uploaded file and extract content"""
-        logger.info(f"🔍 Processing file: {filename} ({len(file_data)} bytes)")
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Process pool for binary parsing, or None when DOCUMENT_PROCESS_WORKERS is 0"""
+        if settings.DOCUMENT_PROCESS_WORKERS <= 0:
+            return None
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(max_workers=settings.DOCUMENT_PROCESS_WORKERS)
+        return self.process_pool
+    
+    def close(self):
+        """Shut down the parser pools"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool = None
+    
+    async def process_upload(self, stream: BinaryIO, filename: str, content_type: str) -> Dict[str, Any]:
+        """
+        Process an uploaded file object (e.g. UploadFile.file) without first
+        buffering it into a bytes object. Binary parsers read straight from the
+        spooled upload; only text files are read fully for decoding.
+        
+        With DOCUMENT_PROCESS_WORKERS set, PDF/Office files are instead read
+        into memory and parsed in a worker process, so several large files
+        parse in parallel without contending for the GIL.
+        """
+        kind = self._classify(content_type, self._get_extension(filename))
+        if kind == 'text' and self._is_small_in_memory(stream):
+            # Decoding a few KB costs less than the hop to a worker thread and back
+            return self.process_stream_sync(stream, filename, content_type)
+        
+        loop = asyncio.get_running_loop()
+        process_pool = self._get_process_pool()
+        if process_pool is not None and kind == 'binary':
+            # Uploads are open temp files, which can't be sent to another process
+            file_data = await loop.run_in_executor(self.executor, self._read_stream, stream)
+            return await loop.run_in_executor(
+                process_pool, _process_file_in_worker, file_data, filename, content_type
+            )
+        
+        return await loop.run_in_executor(
+            self.executor, self.process_stream_sync, stream, filename, content_type
+        )
+    
+    async def process_batch(self, uploads: List[Tuple[BinaryIO, str, str]]) -> List[Any]:
+        """
+        Process several (stream, filename, content_type) uploads in one call.
+        Files are queued on the parser pool grouped by extension so workers run
+        the same parser back to back, with at most BULK_CONCURRENCY in flight.
+        Returns one entry per upload in input order: the processed document, or
+        the exception raised for that file.
+        """
+        semaphore = asyncio.Semaphore(settings.BULK_CONCURRENCY)
+        
+        async def process_one(upload: Tuple[BinaryIO, str, str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.process_upload(*upload)
+        
+        order = sorted(range(len(uploads)), key=lambda i: self._get_type_from_extension(uploads[i][1]))
+        tasks = [None] * len(uploads)
+        for i in order:
+            tasks[i] = asyncio.ensure_future(process_one(uploads[i]))
+        
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def process_file_sync(self, file_data: bytes, filename: str, content_type: str) -> Dict[str, Any]:
+        """Process uploaded file and extract content (blocking)"""
+        return self.process_stream_sync(BytesIO(file_data), filename, content_type)
+    
+    def process_stream_sync(self, stream: BinaryIO, filename: str, content_type: str) -> Dict[str, Any]:
+        """Process a seekable binary stream and extract content (blocking)"""
+        stream.seek(0, os.SEEK_END)
+        file_size = stream.tell()
+        stream.seek(0)
+        
+        logger.info(f"🔍 Processing file: {filename} ({file_size} bytes)")
         
         # Validate file size
-        if len(file_data) > self.MAX_FILE_SIZE:
+        if file_size > self.MAX_FILE_SIZE:
             raise ValueError(f"File size exceeds {self.MAX_FILE_SIZE / 1024 / 1024}MB limit")
         
+        # Work out the extension and file kind once; everything below reuses them
+        extension = self._get_extension(filename)
+        
         # Detect actual file type if needed
         if not content_type or content_type == 'application/octet-stream':
-            content_type = self._detect_content_type(file_data, filename)
+            content_type = self.EXTENSION_TYPES.get(extension, 'application/octet-stream')
         
         # Validate file type
-        if not self._is_supported_type(content_type, filename):
-            extension = filename.lower().split('.')[-1] if '.' in filename else 'unknown'
-            supported_exts = ', '.join(self._get_supported_extensions())
-            raise ValueError(f"Unsupported file type: .{extension}\\n\\nSupported formats: {supported_exts}")
+        kind = self._classify(content_type, extension)
+        if kind is None:
+            supported_exts = ', '.join(self.SUPPORTED_EXTENSIONS)
+            raise ValueError(f"Unsupported file type: .{extension or 'unknown'}\\n\\nSupported formats: {supported_exts}")
         
         try:
             content = ""
             extracted_text = ""
             metadata = {}
             
-            if self._is_text_file(content_type, filename):
-                content = await self._extract_text_content(file_data)
+            if kind == 'text':
+                content = self._read_text_stream(stream, file_size)
                 extracted_text = content
                 metadata = {
                     'type': 'Text File',
@@ -65,8 +203,8 @@ class DocumentService:
                     'extraction_success': True,
                     'extraction_quality': 'excellent'
                 }
-            elif self._is_binary_file(content_type, filename):
-                result = await self._extract_binary_content(file_data, filename)
+            else:
+                result = self._extract_binary_content(stream, filename, extension, file_size)
                 content = result['text']
                 extracted_text = result['text']
                 metadata = result['metadata']
@@ -76,8 +214,8 @@ class DocumentService:
             document_info = {
                 'id': self._generate_id(),
                 'name': filename,
-                'type': content_type or self._get_type_from_extension(filename),
-                'size': len(file_data),
+                'type': content_type,
+                'size': file_size,
                 'uploaded_at': datetime.now(),
                 'content': content,
                 'extracted_text': extracted_text,
@@ -92,54 +230,80 @@ class DocumentService:
             logger.error(f"❌ Failed to process {filename}: {error}")
             raise ValueError(f"Failed to process {filename}: {str(error)}")
     
-    async def _extract_text_content(self, file_data: bytes) -> str:
-        """Extract text from text files"""
+    def _is_small_in_memory(self, stream: BinaryIO) -> bool:
+        """True for uploads held in memory and no larger than INLINE_TEXT_MAX_SIZE"""
+        if self._disk_fileno(stream) is not None:
+            return False
+        size = stream.seek(0, os.SEEK_END)
+        stream.seek(0)
+        return size <= self.INLINE_TEXT_MAX_SIZE
+    
+    def _read_stream(self, stream: BinaryIO) -> bytes:
+        """Read a whole upload from the start"""
+        stream.seek(0)
+        return stream.read()
+    
+    def _read_text_stream(self, stream: BinaryIO, file_size: int) -> str:
+        """
+        Decode a text upload. When the upload is backed by a real file (Starlette
+        rolls large uploads to disk) the text is decoded straight from a read-only
+        mmap of it, skipping the intermediate bytes copy of stream.read().
+        """
+        fileno = self._disk_fileno(stream) if file_size else None
+        if fileno is None:
+            return self._extract_text_content(stream.read())
+        
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+            return self._extract_text_content(mapped)
+    
+    def _disk_fileno(self, stream: BinaryIO) -> Optional[int]:
+        """File descriptor behind a stream, or None if it only lives in memory"""
+        # fileno() on an in-memory SpooledTemporaryFile would force it to disk
+        if isinstance(stream, tempfile.SpooledTemporaryFile) and not stream._rolled:
+            return None
+        try:
+            return stream.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+    
+    def _extract_text_content(self, file_data) -> str:
+        """Extract text from text files (bytes or any buffer, e.g. an mmap)"""
         try:
             # Try UTF-8 first, fallback to other encodings
             encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
             
             for encoding in encodings:
                 try:
-                    return file_data.decode(encoding)
+                    return str(file_data, encoding)
                 except UnicodeDecodeError:
                     continue
                     
             # If all encodings fail, decode with errors='replace'
-            return file_data.decode('utf-8', errors='replace')
+            return str(file_data, 'utf-8', 'replace')
             
         except Exception as error:
             raise ValueError(f"Failed to read text file: {error}")
     
-    async def _extract_binary_content(self, file_data: bytes, filename: str) -> Dict[str, Any]:
+    def _extract_binary_content(self, stream: BinaryIO, filename: str, extension: str, file_size: int) -> Dict[str, Any]:
         """Extract content from binary files"""
-        extension = filename.lower().split('.')[-1] if '.' in filename else ''
-        
         logger.info(f"📄 Extracting binary content from .{extension} file")
         
         try:
-            if extension == 'pdf':
-                return await self._extract_pdf_content(file_data, filename)
-            elif extension == 'docx':
-                return await self._extract_word_content(file_data, filename)
-            elif extension == 'pptx':
-                return await self._extract_powerpoint_content(file_data, filename)
-            elif extension in ['xlsx', 'xls']:
-                return await self._extract_excel_content(file_data, filename)
-            else:
+            extractor = self._BINARY_EXTRACTORS.get(extension)
+            if extractor is None:
                 raise ValueError(f"Unsupported binary format: .{extension}")
+            return getattr(self, extractor)(stream, filename, file_size)
                 
         except Exception as error:
             logger.error(f"❌ Error extracting content from {filename}: {error}")
             raise error
     
-    async def _extract_pdf_content(self, file_data: bytes, filename: str) -> Dict[str, Any]:
+    def _extract_pdf_content(self, stream: BinaryIO, filename: str, file_size: int) -> Dict[str, Any]:
         """Extract text from PDF files"""
         logger.info(f"🔍 Starting PDF extraction for: {filename}")
         
         try:
-            from io import BytesIO
-            pdf_file = BytesIO(file_data)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            pdf_reader = PyPDF2.PdfReader(stream)
             
             num_pages = len(pdf_reader.pages)
             logger.info(f"📖 PDF loaded: {num_pages} pages")
@@ -219,7 +383,7 @@ This PDF could not be processed. Common reasons:
 • Corrupted file
 • Complex formatting
 
-File size: {len(file_data) // 1024}KB
+File size: {file_size // 1024}KB
 Upload date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 The AI can still reference this document by name but won't have access to its content."""
@@ -235,14 +399,12 @@ The AI can still reference this document by name but won't have access to its co
                 }
             }
     
-    async def _extract_word_content(self, file_data: bytes, filename: str) -> Dict[str, Any]:
+    def _extract_word_content(self, stream: BinaryIO, filename: str, file_size: int) -> Dict[str, Any]:
         """Extract text from Word documents"""
         logger.info(f"📝 Starting Word extraction for: {filename}")
         
         try:
-            from io import BytesIO
-            doc_file = BytesIO(file_data)
-            doc = Document(doc_file)
+            doc = Document(stream)
             
             # Extract text from all paragraphs
             text_content = []
@@ -272,14 +434,12 @@ The AI can still reference this document by name but won't have access to its co
             logger.error(f"❌ Word extraction error: {error}")
             raise ValueError(f"Word document extraction failed: {error}")
     
-    async def _extract_powerpoint_content(self, file_data: bytes, filename: str) -> Dict[str, Any]:
+    def _extract_powerpoint_content(self, stream: BinaryIO, filename: str, file_size: int) -> Dict[str, Any]:
         """Extract text from PowerPoint presentations"""
         logger.info(f"🎯 Starting PowerPoint extraction for: {filename}")
         
         try:
-            from io import BytesIO
-            ppt_file = BytesIO(file_data)
-            presentation = Presentation(ppt_file)
+            presentation = Presentation(stream)
             
             full_text = f"PowerPoint Presentation: {filename}\\n{'=' * 50}\\n\\n"
             slide_count = len(presentation.slides)
@@ -319,14 +479,12 @@ The AI can still reference this document by name but won't have access to its co
             logger.error(f"❌ PowerPoint extraction error: {error}")
             raise ValueError(f"PowerPoint extraction failed: {error}")
     
-    async def _extract_excel_content(self, file_data: bytes, filename: str) -> Dict[str, Any]:
+    def _extract_excel_content(self, stream: BinaryIO, filename: str, file_size: int) -> Dict[str, Any]:
         """Extract content from Excel files"""
         logger.info(f"📊 Starting Excel extraction for: {filename}")
         
         try:
-            from io import BytesIO
-            excel_file = BytesIO(file_data)
-            workbook = openpyxl.load_workbook(excel_file)
+            workbook = openpyxl.load_workbook(stream)
             
             full_text = f"Excel Spreadsheet: {filename}\\n{'=' * 50}\\n\\n"
             total_rows = 0
@@ -364,65 +522,21 @@ The AI can still reference this document by name but won't have access to its co
             logger.error(f"❌ Excel extraction error: {error}")
             raise ValueError(f"Excel extraction failed: {error}")
     
-    def _detect_content_type(self, file_data: bytes, filename: str) -> str:
-        """Detect file content type from extension (simplified version)"""
-        # For now, use extension-based detection
-        # In production, you might want to install libmagic for better detection
-        return self._get_type_from_extension(filename)
+    def _get_extension(self, filename: str) -> str:
+        """Lowercased extension without the dot, or '' if there is none"""
+        return filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
     
-    def _is_text_file(self, mime_type: str, filename: str) -> bool:
-        """Check if file is a text file"""
-        if mime_type in self.TEXT_FILE_TYPES:
-            return True
-        
-        extension = filename.lower().split('.')[-1] if '.' in filename else ''
-        text_extensions = [
-            'txt', 'md', 'json', 'csv', 'html', 'htm', 'js', 'ts', 'jsx', 'tsx',
-            'css', 'scss', 'sass', 'xml', 'yaml', 'yml', 'log', 'sql', 'py', 'java',
-            'cpp', 'c', 'h', 'php', 'rb', 'go', 'rs', 'sh', 'bat', 'ps1', 'r'
-        ]
-        
-        return extension in text_extensions
-    
-    def _is_binary_file(self, mime_type: str, filename: str) -> bool:
-        """Check if file is a supported binary file"""
-        if mime_type in self.BINARY_FILE_TYPES:
-            return True
-        
-        extension = filename.lower().split('.')[-1] if '.' in filename else ''
-        binary_extensions = ['pdf', 'docx', 'pptx', 'xlsx', 'xls']
-        
-        return extension in binary_extensions
-    
-    def _is_supported_type(self, mime_type: str, filename: str) -> bool:
-        """Check if file type is supported"""
-        return self._is_text_file(mime_type, filename) or self._is_binary_file(mime_type, filename)
+    def _classify(self, mime_type: str, extension: str) -> Optional[str]:
+        """'text', 'binary', or None for an unsupported file"""
+        if mime_type in self._TEXT_FILE_TYPE_SET or extension in self._TEXT_EXTENSION_SET:
+            return 'text'
+        if mime_type in self._BINARY_FILE_TYPE_SET or extension in self._BINARY_EXTENSION_SET:
+            return 'binary'
+        return None
     
     def _get_type_from_extension(self, filename: str) -> str:
         """Get MIME type from file extension"""
-        extension = filename.lower().split('.')[-1] if '.' in filename else ''
-        
-        type_map = {
-            'txt': 'text/plain',
-            'md': 'text/markdown',
-            'json': 'application/json',
-            'csv': 'text/csv',
-            'html': 'text/html',
-            'htm': 'text/html',
-            'js': 'application/javascript',
-            'ts': 'application/typescript',
-            'css': 'text/css',
-            'xml': 'application/xml',
-            'yaml': 'application/yaml',
-            'yml': 'application/yaml',
-            'pdf': 'application/pdf',
-            'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-            'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'xls': 'application/vnd.ms-excel'
-        }
-        
-        return type_map.get(extension, 'application/octet-stream')
+        return self.EXTENSION_TYPES.get(self._get_extension(filename), 'application/octet-stream')
     
     def _generate_summary(self, content: str, filename: str, metadata: Dict[str, Any] = None) -> str:
         """Generate a summary of the document"""
@@ -500,17 +614,6 @@ The AI can still reference this document by name but won't have access to its co
         
         return formatted_doc
     
-    def _get_supported_extensions(self) -> list:
-        """Get list of supported file extensions"""
-        return [
-            # Text files
-            'txt', 'md', 'json', 'csv', 'html', 'htm', 'js', 'ts', 'jsx', 'tsx',
-            'css', 'scss', 'sass', 'xml', 'yaml', 'yml', 'log', 'sql', 'py', 'java',
-            'cpp', 'c', 'h', 'php', 'rb', 'go', 'rs', 'sh', 'bat', 'ps1', 'r',
-            # Binary files
-            'pdf', 'docx', 'pptx', 'xlsx', 'xls'
-        ]
-    
     async def delete_document(self, document_id: str, user_id: str) -> bool:
         """Delete a document from the database (user must own the document)"""
         logger.info(f"🗑️ Deleting document {document_id} for user {user_id}")
@@ -556,4 +659,8 @@ The AI can still reference this document by name but won't have access to its co
             raise
 
 # Create singleton instance
-document_service = DocumentService()
\ No newline at end of file
+document_service = DocumentService()
+
+def _process_file_in_worker(file_data: bytes, filename: str, content_type: str) -> Dict[str, Any]:
+    """Process pool entry point; runs against the worker process's own singleton"""
+    return document_service.process_file_sync(file_data, filename, content_type)
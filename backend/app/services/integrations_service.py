@@ -15,8 +15,8 @@ All OAuth functionality has been removed as it was incorrectly set up.
 
 import asyncio
 import aiohttp
-import json
 import logging
+import orjson
 import time
 import feedparser
 import whois
@@ -86,7 +86,7 @@ class IntegrationsService:
                         raise Exception(f"HTTP request failed: {response.status} {response.reason}")
                     
                     try:
-                        result = await response.json()
+                        result = await response.json(loads=orjson.loads)
                     except:
                         result = await response.text()
                     
@@ -160,7 +160,7 @@ class IntegrationsService:
                             "error": f"Tavily API error: {response.status}"
                         }
                     
-                    result = await response.json()
+                    result = await response.json(loads=orjson.loads)
                     
                     # Format response to match expected structure
                     formatted_results = []
@@ -278,7 +278,7 @@ class IntegrationsService:
                     
                     if response.ok:
                         try:
-                            result["response"] = await response.json()
+                            result["response"] = await response.json(loads=orjson.loads)
                         except:
                             result["response"] = await response.text()
                     else:
@@ -358,7 +358,7 @@ class IntegrationsService:
                             "error": f"Firecrawl API error: {response.status}"
                         }
                     
-                    result = await response.json()
+                    result = await response.json(loads=orjson.loads)
                     
                     # Extract the content based on the response structure
                     content = ""
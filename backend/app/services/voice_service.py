@@ -19,25 +19,60 @@ import asyncio
 import json
 import logging
 import time
+from collections import deque
 from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime, timedelta
 import uuid
 
 from .integrations_service import integrations_service
 from .database_service import database_service
+from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+SESSION_MAX_AGE = timedelta(hours=2)
+
+class SessionLimitError(RuntimeError):
+    """Raised when MAX_VOICE_SESSIONS live sessions are already held"""
+
+class SessionLog:
+    """
+    Event log for one voice session, bounded so long calls can't grow it
+    without limit. Keeps the first `sink_size` entries and a sliding window
+    of the last `window_size`; anything in between is dropped and counted.
+    """
+    __slots__ = ("sink", "recent", "sink_size", "dropped")
+    
+    def __init__(self, sink_size: int, window_size: int):
+        self.sink: List[Dict[str, Any]] = []
+        self.recent: deque = deque(maxlen=window_size)
+        self.sink_size = sink_size
+        self.dropped = 0
+    
+    def append(self, entry: Dict[str, Any]):
+        if len(self.sink) < self.sink_size:
+            self.sink.append(entry)
+            return
+        if len(self.recent) == self.recent.maxlen:
+            self.dropped += 1
+        self.recent.append(entry)
+    
+    def entries(self) -> List[Dict[str, Any]]:
+        return self.sink + list(self.recent)
+    
+    def __len__(self) -> int:
+        return len(self.sink) + len(self.recent)
+
 class VoiceService:
     def __init__(self):
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
         self.function_handlers: Dict[str, Callable] = {}
-        self.session_contexts: Dict[str, List[Dict[str, Any]]] = {}
+        self.session_contexts: Dict[str, SessionLog] = {}
         
         # Register built-in function handlers
         self._register_function_handlers()
         
-        logger.info("🎤 Voice Service initialized")
+        logger.info("Voice Service initialized")
 
     def _register_function_handlers(self):
         """Register all available function handlers"""
@@ -51,7 +86,7 @@ class VoiceService:
             "search_web": self._handle_web_search,
             "scrape_website": self._handle_website_scraping,
         }
-        logger.info(f"📋 Registered {len(self.function_handlers)} function handlers")
+        logger.info("Registered %s function handlers", len(self.function_handlers))
 
     async def create_session(self, user_id: str, contact: Dict[str, Any], user_token: str = None) -> Dict[str, Any]:
         """
@@ -60,12 +95,18 @@ class VoiceService:
         Returns session info including ephemeral token for secure frontend connection
         """
         try:
+            if len(self.active_sessions) >= settings.MAX_VOICE_SESSIONS:
+                self._evict_stale_sessions()
+                if len(self.active_sessions) >= settings.MAX_VOICE_SESSIONS:
+                    raise SessionLimitError(f"Voice session limit reached ({settings.MAX_VOICE_SESSIONS})")
+            
             session_id = f"voice_session_{int(time.time())}_{uuid.uuid4().hex[:8]}"
             
             # Generate ephemeral token (valid for session duration)
             ephemeral_token = self._generate_ephemeral_token(session_id, user_id)
             
-            # Initialize session context
+            # Initialize session context. It takes its slot before the prompt
+            # is built, so concurrent creates can't all pass the limit check
             session_context = {
                 "session_id": session_id,
                 "user_id": user_id,
@@ -73,14 +114,23 @@ class VoiceService:
                 "created_at": datetime.utcnow().isoformat(),
                 "ephemeral_token": ephemeral_token,
                 "function_declarations": self._get_function_declarations(contact),
-                "system_prompt": await self._build_system_prompt(contact, user_id, user_token),
-                "status": "initialized"
+                "system_prompt": "",
+                "status": "initializing"
             }
-            
             self.active_sessions[session_id] = session_context
-            self.session_contexts[session_id] = []
+            try:
+                session_context["system_prompt"] = await self._build_system_prompt(contact, user_id, user_token)
+            except Exception:
+                self.active_sessions.pop(session_id, None)
+                raise
+            session_context["status"] = "initialized"
+            
+            self.session_contexts[session_id] = SessionLog(
+                settings.VOICE_SESSION_SINK_ENTRIES,
+                settings.VOICE_SESSION_WINDOW_ENTRIES
+            )
             
-            logger.info(f"🎤 Created voice session {session_id} for user {user_id}")
+            logger.info("Created voice session %s for user %s", session_id, user_id)
             
             return {
                 "session_id": session_id,
@@ -91,7 +141,7 @@ class VoiceService:
             }
             
         except Exception as e:
-            logger.error(f"❌ Failed to create voice session: {e}")
+            logger.error("Failed to create voice session: %s", e)
             raise
 
     def _generate_ephemeral_token(self, session_id: str, user_id: str) -> str:
@@ -304,7 +354,7 @@ class VoiceService:
             }
         })
         
-        logger.info(f"📋 Generated {len(function_declarations)} function declarations")
+        logger.info("Generated %s function declarations", len(function_declarations))
         return function_declarations
 
     async def _build_system_prompt(self, contact: Dict[str, Any], user_id: str, user_token: str = None) -> str:
@@ -315,38 +365,38 @@ class VoiceService:
         agent_id = contact.get('id')
         document_context = {"permanentDocuments": [], "conversationDocuments": []}
         
-        logger.info(f'🔍 Building system prompt for contact: {contact.get("name")} with ID: {agent_id}')
-        logger.info(f'📋 Contact data keys: {list(contact.keys())}')
+        logger.info("Building system prompt for contact: %s with ID: %s", contact.get("name"), agent_id)
+        logger.debug("Contact data keys: %s", list(contact))
         
         if agent_id:
             try:
-                logger.info(f'📚 Loading document context for agent: {contact.get("name")} (ID: {agent_id})')
+                logger.info("Loading document context for agent: %s (ID: %s)", contact.get("name"), agent_id)
                 document_context = await database_service.get_all_agent_context(agent_id, user_token)
-                logger.info(f'✅ Loaded {len(document_context["permanentDocuments"])} permanent + {len(document_context["conversationDocuments"])} conversation documents')
+                logger.info("Loaded %s permanent + %s conversation documents", len(document_context["permanentDocuments"]), len(document_context["conversationDocuments"]))
                 
                 # Check if database returned empty but contact has documents (database failure case)
                 total_db_docs = len(document_context["permanentDocuments"]) + len(document_context["conversationDocuments"])
                 contact_documents = contact.get('documents', [])
                 
                 if total_db_docs == 0 and contact_documents:
-                    logger.warning(f'⚠️ Database returned no documents but contact has {len(contact_documents)} documents - using fallback')
+                    logger.warning("Database returned no documents but contact has %s documents - using fallback", len(contact_documents))
                     document_context = {
                         "permanentDocuments": contact_documents,
                         "conversationDocuments": []
                     }
                     
             except Exception as e:
-                logger.warning(f'⚠️ Failed to load document context for agent {agent_id}: {e}')
+                logger.warning("Failed to load document context for agent %s: %s", agent_id, e)
                 # Fallback: use documents from contact data if database fails
                 contact_documents = contact.get('documents', [])
                 if contact_documents:
-                    logger.info(f'📁 Using fallback: {len(contact_documents)} documents from contact data')
+                    logger.info("Using fallback: %s documents from contact data", len(contact_documents))
                     document_context = {
                         "permanentDocuments": contact_documents,
                         "conversationDocuments": []
                     }
                 else:
-                    logger.info('📁 No documents in contact data either')
+                    logger.info("No documents in contact data either")
         
         # Build base prompt with name and description
         system_prompt = f"You are {contact.get('name', 'Assistant')}, {contact.get('description', 'a helpful AI assistant')}."
@@ -399,11 +449,11 @@ CRITICAL VOICE MODE INSTRUCTIONS:
 - Use natural speech patterns and contractions
 - If you need to pause, use natural speech fillers like "let me think..." rather than silence"""
 
-        logger.info(f'📝 Final system prompt length: {len(system_prompt)} characters')
+        logger.info("Final system prompt length: %s characters", len(system_prompt))
         if all_documents:
-            logger.info(f'📚 System prompt includes {len(all_documents)} documents')
+            logger.info("System prompt includes %s documents", len(all_documents))
         else:
-            logger.warning('⚠️ No documents included in system prompt')
+            logger.warning("No documents included in system prompt")
         
         return system_prompt
 
@@ -461,7 +511,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             if function_name not in self.function_handlers:
                 raise ValueError(f"Function {function_name} not supported")
             
-            logger.info(f"🔧 Handling function call: {function_name} for session {session_id}")
+            logger.info("Handling function call: %s for session %s", function_name, session_id)
             
             # Get session context
             session = self.active_sessions[session_id]
@@ -478,7 +528,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
                 "timestamp": datetime.utcnow().isoformat()
             })
             
-            logger.info(f"✅ Function call {function_name} completed successfully")
+            logger.info("Function call %s completed successfully", function_name)
             
             return {
                 "success": True,
@@ -487,7 +537,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             }
             
         except Exception as e:
-            logger.error(f"❌ Function call {function_name} failed: {e}")
+            logger.error("Function call %s failed: %s", function_name, e)
             return {
                 "success": False,
                 "function": function_name,
@@ -525,7 +575,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
                 }
             }
             
-            logger.info(f"📄 Generated document {document_id} ({len(content)} characters)")
+            logger.info("Generated document %s (%s characters)", document_id, len(content))
             
             return {
                 "document": document_info,
@@ -533,7 +583,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             }
             
         except Exception as e:
-            logger.error(f"❌ Document generation failed: {e}")
+            logger.error("Document generation failed: %s", e)
             raise
 
     async def _handle_api_request(self, session: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
@@ -547,13 +597,13 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             if not url:
                 raise ValueError("URL is required for API request")
             
-            logger.info(f"🌐 Processing API request: {method} {url}")
+            logger.info("Processing API request: %s %s", method, url)
             result = await integrations_service.execute_api_request(url, method, headers, body)
             
             return result
             
         except Exception as e:
-            logger.error(f"❌ API request failed: {e}")
+            logger.error("API request failed: %s", e)
             raise
 
     async def _handle_domain_check(self, session: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
@@ -565,13 +615,13 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             if not domain:
                 raise ValueError("Domain is required for domain check")
             
-            logger.info(f"🔍 Processing domain check: {domain}")
+            logger.info("Processing domain check: %s", domain)
             result = await integrations_service.check_domain_availability(domain, variations)
             
             return result
             
         except Exception as e:
-            logger.error(f"❌ Domain check failed: {e}")
+            logger.error("Domain check failed: %s", e)
             raise
 
     async def _handle_webhook_trigger(self, session: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
@@ -584,7 +634,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             
             # For webhook triggers, we'd need the webhook URL from the contact's integration config
             # For now, return a mock response
-            logger.info(f"🪝 Processing webhook trigger: {action}")
+            logger.info("Processing webhook trigger: %s", action)
             
             return {
                 "success": True,
@@ -594,7 +644,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             }
             
         except Exception as e:
-            logger.error(f"❌ Webhook trigger failed: {e}")
+            logger.error("Webhook trigger failed: %s", e)
             raise
 
     async def _handle_google_sheets(self, session: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
@@ -605,7 +655,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             if not operation:
                 raise ValueError("Operation is required for Google Sheets")
             
-            logger.info(f"📊 Processing Google Sheets operation: {operation}")
+            logger.info("Processing Google Sheets operation: %s", operation)
             
             # OAuth was incorrectly configured, so return disabled message
             return {
@@ -615,7 +665,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             }
             
         except Exception as e:
-            logger.error(f"❌ Google Sheets operation failed: {e}")
+            logger.error("Google Sheets operation failed: %s", e)
             raise
 
     async def _handle_notion(self, session: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
@@ -626,7 +676,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             if not operation:
                 raise ValueError("Operation is required for Notion")
             
-            logger.info(f"📝 Processing Notion operation: {operation}")
+            logger.info("Processing Notion operation: %s", operation)
             
             # OAuth was incorrectly configured, so return disabled message  
             return {
@@ -636,7 +686,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             }
             
         except Exception as e:
-            logger.error(f"❌ Notion operation failed: {e}")
+            logger.error("Notion operation failed: %s", e)
             raise
 
     async def _handle_web_search(self, session: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
@@ -649,13 +699,13 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             if not query:
                 raise ValueError("Query is required for web search")
             
-            logger.info(f"🔍 Processing web search: {query}")
+            logger.info("Processing web search: %s", query)
             result = await integrations_service.execute_web_search_tool(query, search_depth, max_results, True)
             
             return result
             
         except Exception as e:
-            logger.error(f"❌ Web search failed: {e}")
+            logger.error("Web search failed: %s", e)
             raise
 
     async def _handle_website_scraping(self, session: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
@@ -669,13 +719,13 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             if not url:
                 raise ValueError("URL is required for website scraping")
             
-            logger.info(f"🕷️ Processing website scraping: {url}")
+            logger.info("Processing website scraping: %s", url)
             result = await integrations_service.execute_firecrawl_tool_operation(url, extract_type, include_images, max_pages)
             
             return result
             
         except Exception as e:
-            logger.error(f"❌ Website scraping failed: {e}")
+            logger.error("Website scraping failed: %s", e)
             raise
 
     async def get_session_context(self, session_id: str) -> Dict[str, Any]:
@@ -685,9 +735,22 @@ CRITICAL VOICE MODE INSTRUCTIONS:
         if session_id not in self.active_sessions:
             raise ValueError(f"Session {session_id} not found")
         
+        log = self.session_contexts.get(session_id)
         return {
             "session": self.active_sessions[session_id],
-            "context": self.session_contexts.get(session_id, [])
+            "context": log.entries() if log else [],
+            "dropped_entries": log.dropped if log else 0
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Session and event-log occupancy, for the health endpoint"""
+        logs = self.session_contexts.values()
+        return {
+            "active_sessions": len(self.active_sessions),
+            "max_sessions": settings.MAX_VOICE_SESSIONS,
+            "logged_entries": sum(len(log) for log in logs),
+            "dropped_entries": sum(log.dropped for log in logs),
+            "max_entries_per_session": settings.VOICE_SESSION_SINK_ENTRIES + settings.VOICE_SESSION_WINDOW_ENTRIES
         }
 
     async def end_session(self, session_id: str) -> Dict[str, Any]:
@@ -703,7 +766,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
                 # Keep session data for a short time for potential retrieval
                 # In production, you might want to store this in a database
                 
-                logger.info(f"🎤 Ended voice session {session_id}")
+                logger.info("Ended voice session %s", session_id)
                 
                 return {
                     "success": True,
@@ -711,19 +774,33 @@ CRITICAL VOICE MODE INSTRUCTIONS:
                     "duration": self._calculate_session_duration(session)
                 }
             else:
-                logger.warning(f"⚠️ Attempted to end non-existent session {session_id}")
+                logger.warning("Attempted to end non-existent session %s", session_id)
                 return {
                     "success": False,
                     "error": "Session not found"
                 }
                 
         except Exception as e:
-            logger.error(f"❌ Failed to end session {session_id}: {e}")
+            logger.error("Failed to end session %s: %s", session_id, e)
             return {
                 "success": False,
                 "error": str(e)
             }
 
+    def _evict_stale_sessions(self):
+        """Free ended and expired sessions to make room for new ones"""
+        cutoff = (datetime.utcnow() - SESSION_MAX_AGE).isoformat()
+        stale = [
+            session_id for session_id, session in self.active_sessions.items()
+            if session["status"] == "ended" or session["created_at"] < cutoff
+        ]
+        for session_id in stale:
+            del self.active_sessions[session_id]
+            self.session_contexts.pop(session_id, None)
+        
+        if stale:
+            logger.info("Evicted %s stale voice sessions", len(stale))
+
     def _calculate_session_duration(self, session: Dict[str, Any]) -> int:
         """Calculate session duration in seconds"""
         try:
@@ -744,7 +821,7 @@ CRITICAL VOICE MODE INSTRUCTIONS:
             
             for session_id, session in self.active_sessions.items():
                 created_at = datetime.fromisoformat(session["created_at"])
-                if now - created_at > timedelta(hours=2):  # 2 hour max session
+                if now - created_at > SESSION_MAX_AGE:
                     expired_sessions.append(session_id)
             
             for session_id in expired_sessions:
@@ -754,10 +831,10 @@ CRITICAL VOICE MODE INSTRUCTIONS:
                     del self.session_contexts[session_id]
             
             if expired_sessions:
-                logger.info(f"🧹 Cleaned up {len(expired_sessions)} expired sessions")
+                logger.info("Cleaned up %s expired sessions", len(expired_sessions))
                 
         except Exception as e:
-            logger.error(f"❌ Session cleanup failed: {e}")
+            logger.error("Session cleanup failed: %s", e)
 
 # Global voice service instance
 voice_service = VoiceService()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+def async_ttl_cache(ttl: float):
+    """
+    Cache an async function's result for `ttl` seconds per argument tuple.
+
+    Calls are single-flight: while a refresh is running, concurrent callers
+    share that one call instead of starting their own. If an earlier result
+    exists they get it straight away (stale-while-revalidate); only the very
+    first callers wait. Failed calls are not cached.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        entries: Dict[Tuple, Tuple[float, Any]] = {}  # key -> (expires_at, value)
+        in_flight: Dict[Tuple, asyncio.Future] = {}
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            entry = entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            task = in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                in_flight[key] = task
+
+                def store(done: asyncio.Future):
+                    in_flight.pop(key, None)
+                    if not done.cancelled() and done.exception() is None:
+                        entries[key] = (time.monotonic() + ttl, done.result())
+
+                task.add_done_callback(store)
+
+            if entry is not None:
+                return entry[1]
+            # Shield so one caller disconnecting doesn't cancel the shared call
+            return await asyncio.shield(task)
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,39 @@
+import hashlib
+from typing import Any, Optional
+import orjson
+from fastapi import Request, Response
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Stop nginx-style proxies from buffering the stream
+}
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> bytes:
+    """Encode one server-sent event frame with a JSON payload"""
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    if event:
+        frame = b"event: " + event.encode() + b"\n" + frame
+    return frame
+
+
+class StaticJSONResponse:
+    """
+    JSON body that never changes for the lifetime of the process.
+    Serialized once at import, served with Cache-Control and an ETag so
+    browsers/CDNs can revalidate with a 304 instead of refetching.
+    """
+
+    def __init__(self, content: Any, max_age: int = 3600):
+        self.body = orjson.dumps(content)
+        self.etag = f'"{hashlib.md5(self.body).hexdigest()}"'
+        self.headers = {
+            "Cache-Control": f"public, max-age={max_age}",
+            "ETag": self.etag,
+        }
+
+    def __call__(self, request: Request) -> Response:
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=self.headers)
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
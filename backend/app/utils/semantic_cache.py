@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+
+
+class _ContextEntries:
+    """Embeddings and replies cached under one prompt context"""
+    __slots__ = ("embeddings", "replies", "last_used", "size")
+
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, dimensions: int):
+        self.embeddings = np.empty((self.INITIAL_CAPACITY, dimensions), dtype=np.float32)
+        self.last_used = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.replies: List[str] = []
+        self.size = 0
+
+    def grow(self, capacity: int):
+        embeddings = np.empty((capacity, self.embeddings.shape[1]), dtype=np.float32)
+        embeddings[:self.size] = self.embeddings[:self.size]
+        last_used = np.zeros(capacity, dtype=np.int64)
+        last_used[:self.size] = self.last_used[:self.size]
+        self.embeddings, self.last_used = embeddings, last_used
+
+
+class SemanticResponseCache:
+    """
+    Replies to earlier messages, found again by embedding similarity.
+
+    Entries are grouped by a context key (a hash of the system prompt, so a
+    different contact or document set never matches) and each group holds
+    L2-normalized query embeddings as rows of one float32 matrix: a lookup
+    is a single matrix-vector product. Groups keep at most `max_entries`
+    replies, overwriting the least recently used; the least recently used
+    groups beyond `max_contexts` are dropped whole.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, max_contexts: int = 64):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_contexts = max_contexts
+        self._contexts: "OrderedDict[bytes, _ContextEntries]" = OrderedDict()
+        self._clock = 0
+
+    @staticmethod
+    def prepare(values: List[float]) -> Optional[np.ndarray]:
+        """Normalized query vector from raw embedding values; None for a zero vector"""
+        vector = np.asarray(values, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if not norm:
+            return None
+        return vector / norm
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def lookup(self, context_key: bytes, query: np.ndarray) -> Optional[str]:
+        """Reply whose query is at least `threshold` cosine-similar to this one, if any"""
+        entries = self._contexts.get(context_key)
+        if entries is None or not entries.size or entries.embeddings.shape[1] != query.shape[0]:
+            return None
+        self._contexts.move_to_end(context_key)
+
+        scores = entries.embeddings[:entries.size] @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        entries.last_used[best] = self._tick()
+        return entries.replies[best]
+
+    def insert(self, context_key: bytes, query: np.ndarray, reply: str):
+        entries = self._contexts.get(context_key)
+        if entries is None or entries.embeddings.shape[1] != query.shape[0]:
+            entries = self._contexts[context_key] = _ContextEntries(query.shape[0])
+            if len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+        else:
+            self._contexts.move_to_end(context_key)
+
+        if entries.size < self.max_entries:
+            if entries.size == entries.embeddings.shape[0]:
+                entries.grow(min(entries.size * 2, self.max_entries))
+            index = entries.size
+            entries.size += 1
+            entries.replies.append(reply)
+        else:
+            index = int(np.argmin(entries.last_used))
+            entries.replies[index] = reply
+
+        entries.embeddings[index] = query
+        entries.last_used[index] = self._tick()
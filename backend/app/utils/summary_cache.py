@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+
+def summary_cache_key(model: str, text: str) -> str:
+    """Cache key for a summary of `text` by `model`; a model change never reuses old summaries"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model.encode())
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Document summaries in a local SQLite file, keyed by summary_cache_key.
+
+    sqlite3 blocks, so every call runs in a worker thread; one connection is
+    shared between threads behind a lock, which is plenty for a handful of
+    small reads and writes per upload.
+    """
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS summary_cache ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, model TEXT NOT NULL, created_at INTEGER NOT NULL)"
+            )
+
+    def _get_many(self, keys: List[str]) -> Dict[str, str]:
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT key, summary FROM summary_cache WHERE key IN ({placeholders})", keys
+            ).fetchall()
+        return dict(rows)
+
+    def _set_many(self, summaries: Dict[str, str], model: str):
+        now = int(time.time())
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO summary_cache (key, summary, model, created_at) VALUES (?, ?, ?, ?)",
+                [(key, summary, model, now) for key, summary in summaries.items()]
+            )
+
+    async def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Cached summaries for whichever of `keys` have one"""
+        if not keys:
+            return {}
+        return await asyncio.to_thread(self._get_many, keys)
+
+    async def set_many(self, summaries: Dict[str, str], model: str):
+        """Store key -> summary pairs, replacing any existing entries"""
+        await asyncio.to_thread(self._set_many, summaries, model)
+
+    async def close(self):
+        await asyncio.to_thread(self._connection.close)
@@ -0,0 +1,67 @@
+import asyncio
+import random
+import time
+from typing import Any
+import httpx
+
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.1  # Seconds; doubles per attempt, with jitter
+RETRY_MAX_DELAY = 2.0
+
+# Status codes PostgREST/the gateway return for conditions worth retrying.
+# postgrest-py raises APIError with the HTTP status as `code` when the error
+# body isn't PostgREST JSON (e.g. a 503 page from the load balancer).
+_TRANSIENT_CODES = {"429", "500", "502", "503", "504"}
+
+
+def _is_transient(error: Exception) -> bool:
+    """Network failures and rate-limit/unavailable responses; anything else is final"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return str(getattr(error, "code", "")) in _TRANSIENT_CODES
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429
+    return str(getattr(error, "code", "")) == "429"
+
+
+def _backoff_delay(attempt: int, error: Exception) -> float:
+    """Exponential backoff with full jitter; rate limits start from a longer base"""
+    base = RETRY_BASE_DELAY * (5 if _is_rate_limited(error) else 1)
+    return random.uniform(0, min(RETRY_MAX_DELAY, base * 2 ** (attempt - 1)))
+
+
+def execute_sync(query: Any, attempts: int = RETRY_ATTEMPTS) -> Any:
+    """Blocking execute() with retries, for code already running off the event loop"""
+    for attempt in range(1, attempts + 1):
+        try:
+            return query.execute()
+        except Exception as error:
+            if attempt == attempts or not _is_transient(error):
+                raise
+            time.sleep(_backoff_delay(attempt, error))
+
+
+async def execute(query: Any, attempts: int = RETRY_ATTEMPTS) -> Any:
+    """
+    Run a supabase-py query's blocking execute() in a worker thread.
+
+    supabase-py's sync client does a blocking HTTP round trip inside
+    execute(); awaiting it through here keeps the event loop serving other
+    requests meanwhile. Transient failures (connection errors, 429, 5xx) are
+    retried with exponential backoff; other errors are raised immediately.
+    Build the query as usual and pass it unexecuted:
+
+        result = await execute(supabase.table("agent_documents").select("*"))
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return await asyncio.to_thread(query.execute)
+        except Exception as error:
+            if attempt == attempts or not _is_transient(error):
+                raise
+            await asyncio.sleep(_backoff_delay(attempt, error))
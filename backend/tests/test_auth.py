@@ -0,0 +1,132 @@
+import ast
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from jose import jwt
+from app.core import auth
+
+AUTH_SOURCE = Path(__file__).resolve().parent.parent / "app" / "core" / "auth.py"
+
+# supabase-py calls that do a blocking HTTP round trip
+BLOCKING_CALLS = {"get_user"}
+
+def _auth_module():
+    return ast.parse(AUTH_SOURCE.read_text())
+
+def _functions(tree):
+    return {
+        node.name: node for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+
+def test_auth_dependencies_are_async():
+    """Auth dependencies must be async so FastAPI doesn't send them to the threadpool"""
+    functions = _functions(_auth_module())
+    for name in ("get_current_user", "get_current_user_with_token", "get_api_key"):
+        assert isinstance(functions[name], ast.AsyncFunctionDef), f"{name} should be async def"
+
+def test_auth_does_not_block_event_loop():
+    """Blocking Supabase calls may only be passed to asyncio.to_thread, never called directly"""
+    for node in ast.walk(_auth_module()):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            assert node.func.attr not in BLOCKING_CALLS, (
+                f"line {node.lineno}: call {node.func.attr} through asyncio.to_thread"
+            )
+
+# Behaviour of the token cache in _resolve_user, against a stubbed Supabase auth
+
+class FakeAuth:
+    """Stands in for supabase.auth; counts get_user calls"""
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+
+    def get_user(self, token):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("auth unavailable")
+        return SimpleNamespace(user=None if token == "rejected" else {"id": "user-1"})
+
+class Clock:
+    """Replaces auth's time module: wall clock for exp, monotonic for cache expiry"""
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def fake_auth(monkeypatch):
+    fake = FakeAuth()
+    monkeypatch.setattr(auth, "get_supabase_client", lambda: SimpleNamespace(auth=fake))
+    monkeypatch.setattr(auth.settings, "AUTH_CACHE_TTL", 60.0)
+    auth._user_cache.clear()
+    auth._in_flight.clear()
+    for counter in auth._cache_stats:
+        auth._cache_stats[counter] = 0
+    return fake
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth, "time", clock)
+    return clock
+
+def _token(exp):
+    return jwt.encode({"sub": "user-1", "exp": int(exp)}, "test-secret", algorithm="HS256")
+
+def test_concurrent_requests_share_one_lookup(fake_auth):
+    fake_auth.delay = 0.05
+    token = _token(time.time() + 3600)
+
+    async def run():
+        return await asyncio.gather(*(auth._resolve_user(token) for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"id": "user-1"}] * 5
+    assert fake_auth.calls == 1
+    assert auth.auth_cache_stats()["shared"] == 4
+
+def test_cached_user_reused_until_ttl(fake_auth, clock):
+    token = _token(clock.now + 3600)
+    asyncio.run(auth._resolve_user(token))
+    asyncio.run(auth._resolve_user(token))
+    assert fake_auth.calls == 1
+
+    clock.now += 61
+    asyncio.run(auth._resolve_user(token))
+    assert fake_auth.calls == 2
+
+def test_entry_not_served_past_token_exp(fake_auth, clock):
+    token = _token(clock.now + 5)  # exp well inside AUTH_CACHE_TTL
+    asyncio.run(auth._resolve_user(token))
+    clock.now += 6
+    asyncio.run(auth._resolve_user(token))
+    assert fake_auth.calls == 2
+
+def test_expired_token_is_never_cached(fake_auth, clock):
+    token = _token(clock.now - 10)
+    asyncio.run(auth._resolve_user(token))
+    assert auth._user_cache == {}
+
+def test_rejected_token_is_not_cached(fake_auth):
+    assert asyncio.run(auth._resolve_user("rejected")) is None
+    assert asyncio.run(auth._resolve_user("rejected")) is None
+    assert fake_auth.calls == 2
+
+def test_failed_lookup_is_not_cached(fake_auth):
+    token = _token(time.time() + 3600)
+    fake_auth.fail = True
+    with pytest.raises(RuntimeError):
+        asyncio.run(auth._resolve_user(token))
+    assert auth._in_flight == {}
+
+    fake_auth.fail = False
+    assert asyncio.run(auth._resolve_user(token)) == {"id": "user-1"}
+    assert fake_auth.calls == 2
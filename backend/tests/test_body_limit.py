@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from starlette.exceptions import HTTPException
+from app.core.middleware import RequestBodyLimitMiddleware
+
+LIMITS = {"/api/v1/ai": 100, "/api/v1/ai/big": 1000}
+
+async def _echo_app(scope, receive, send):
+    """Reads the whole body and answers 200 with its length"""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(len(body)).encode()})
+
+def _request(path, chunks, content_length=None, method="POST"):
+    """Run one request through the middleware; returns the response status"""
+    headers = [] if content_length is None else [(b"content-length", str(content_length).encode())]
+    scope = {"type": "http", "method": method, "path": path, "headers": headers}
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ] or [{"type": "http.request", "body": b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(RequestBodyLimitMiddleware(_echo_app, LIMITS)(scope, receive, send))
+    return sent[0]["status"]
+
+def test_empty_body_passes_through():
+    """Body-less POSTs (e.g. /ai/test-generation) send Content-Length: 0"""
+    assert _request("/api/v1/ai/test-generation", [], content_length=0) == 200
+
+def test_body_within_limit_passes():
+    assert _request("/api/v1/ai/chat", [b"x" * 100], content_length=100) == 200
+
+def test_oversized_content_length_rejected_unread():
+    assert _request("/api/v1/ai/chat", [b"x" * 101], content_length=101) == 413
+
+def test_invalid_content_length_rejected():
+    assert _request("/api/v1/ai/chat", [b"x"], content_length="abc") == 400
+
+def test_longest_prefix_wins():
+    assert _request("/api/v1/ai/big", [b"x" * 500], content_length=500) == 200
+
+def test_unlimited_path_and_other_methods_untouched():
+    assert _request("/api/v1/health", [b"x" * 5000], content_length=5000) == 200
+    assert _request("/api/v1/ai/chat", [b"x" * 5000], content_length=5000, method="PUT") == 200
+
+def test_chunked_body_within_limit_passes():
+    assert _request("/api/v1/ai/chat", [b"x" * 50, b"x" * 50]) == 200
+
+def test_chunked_body_cut_off_past_limit():
+    with pytest.raises(HTTPException) as error:
+        _request("/api/v1/ai/chat", [b"x" * 60, b"x" * 60])
+    assert error.value.status_code == 413
@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.utils import cache
+from app.utils.cache import async_ttl_cache
+
+class Clock:
+    """Stands in for time.monotonic so entries can be expired on demand"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the cache's clock: the event loop still needs the real one
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+def test_result_reused_within_ttl(clock):
+    calls = []
+
+    @async_ttl_cache(10)
+    async def fetch(key):
+        calls.append(key)
+        return f"value {key}"
+
+    async def run():
+        assert await fetch("a") == "value a"
+        assert await fetch("a") == "value a"
+        assert await fetch("b") == "value b"
+
+    asyncio.run(run())
+    assert calls == ["a", "b"]
+
+def test_concurrent_callers_share_one_call(clock):
+    calls = 0
+
+    @async_ttl_cache(10)
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        return await asyncio.gather(*(fetch() for _ in range(5)))
+
+    assert asyncio.run(run()) == [1] * 5
+    assert calls == 1
+
+def test_stale_value_served_while_refreshing(clock):
+    calls = 0
+
+    @async_ttl_cache(10)
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        assert await fetch() == 1
+        clock.now += 11
+        # Expired: the old value comes back at once and a refresh starts
+        assert await fetch() == 1
+        assert await fetch() == 1
+        await asyncio.sleep(0.05)
+        assert await fetch() == 2
+
+    asyncio.run(run())
+    assert calls == 2
+
+def test_failures_are_not_cached(clock):
+    calls = 0
+
+    @async_ttl_cache(10)
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("down")
+        return "up"
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await fetch()
+        assert await fetch() == "up"
+
+    asyncio.run(run())
+    assert calls == 2
+
+def test_cache_clear_forces_a_new_call(clock):
+    calls = 0
+
+    @async_ttl_cache(10)
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        assert await fetch() == 1
+        fetch.cache_clear()
+        assert await fetch() == 2
+
+    asyncio.run(run())
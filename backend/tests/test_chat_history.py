@@ -0,0 +1,51 @@
+import pytest
+from app.services.ai_service import ai_service
+
+def _chat(length, reply_chars=4000):
+    """Short user turns alternating with long replies"""
+    return [
+        {"sender": "user", "content": f"question {i}"} if i % 2 == 0
+        else {"sender": "agent", "content": "x" * reply_chars}
+        for i in range(length)
+    ]
+
+@pytest.mark.parametrize("length", [1, 2, 6, 7, 8, 9, 14, 15, 16, 17, 40])
+def test_window_always_keeps_recent_history(length):
+    """Snapping the cut to HISTORY_WINDOW_STEP must never drop every message"""
+    window = ai_service._window_messages(_chat(length))
+    assert window
+    assert window[-1][1] == _chat(length)[-1]["content"]
+
+@pytest.mark.parametrize("length", [6, 7, 8, 14, 15, 16, 40])
+def test_window_fits_token_budget(length):
+    window = ai_service._window_messages(_chat(length))
+    assert sum(len(content) // 4 + 1 for _, content in window) <= ai_service.HISTORY_TOKEN_BUDGET
+
+def test_window_keeps_order_and_roles():
+    chat = _chat(4, reply_chars=10)
+    window = ai_service._window_messages(chat)
+    assert window == [(m["sender"] == "user", m["content"]) for m in chat]
+
+def test_long_newest_message_does_not_wipe_history():
+    """A pasted document as the newest turn is cut down, not a reason to send nothing"""
+    chat = _chat(5, reply_chars=200) + [{"sender": "user", "content": "y " * 20000}]
+    window = ai_service._window_messages(chat)
+    assert len(window) > 1
+    assert window[-1][0] is True
+    assert window[-1][1].endswith("[... truncated ...]")
+    assert len(window[-1][1]) <= ai_service.HISTORY_MESSAGE_MAX_CHARS
+
+def test_message_past_the_budget_is_cut_to_the_remainder():
+    """A long older turn is truncated into what's left of the budget rather than ending the window"""
+    chat = [
+        {"sender": "user", "content": "first"},
+        {"sender": "agent", "content": "z " * 25000},
+        {"sender": "user", "content": "w " * 2000},
+        {"sender": "agent", "content": "last"},
+    ]
+    window = ai_service._window_messages(chat)
+    assert [content[:1] for _, content in window] == ["z", "w", "l"]
+    assert window[0][1].endswith("[... truncated ...]")
+
+def test_empty_history():
+    assert ai_service._window_messages([]) == []
@@ -0,0 +1,187 @@
+import asyncio
+from collections import OrderedDict
+import pytest
+from app.core.config import settings
+from app.services.database_service import DatabaseService
+
+BUCKET = "agent-docs"
+
+class FakeBucket:
+    """Records storage calls in place of a Supabase Storage bucket"""
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+
+    def upload(self, path, data, options=None):
+        self.calls.append(("upload", path))
+        self.objects[path] = data
+
+    def download(self, path):
+        self.calls.append(("download", path))
+        return self.objects[path]
+
+    def remove(self, paths):
+        self.calls.append(("remove", list(paths)))
+        for path in paths:
+            self.objects.pop(path, None)
+
+class FakeStorage:
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def from_(self, name):
+        assert name == BUCKET
+        return self.bucket
+
+class FakeQuery:
+    """Accepts any PostgREST builder chain; the tests replace the calls that execute it"""
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+class FakeAdminClient:
+    def __init__(self, bucket):
+        self.storage = FakeStorage(bucket)
+
+    def from_(self, table):
+        return FakeQuery()
+
+@pytest.fixture
+def bucket(monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_STORAGE_BUCKET", BUCKET)
+    monkeypatch.setattr(settings, "DOCUMENT_STORAGE_MIN_CHARS", 10)
+    return FakeBucket()
+
+@pytest.fixture
+def service(bucket):
+    # Skip __init__ so no real Supabase client is created
+    service = DatabaseService.__new__(DatabaseService)
+    service.admin_supabase = FakeAdminClient(bucket)
+    service._user_clients = OrderedDict()
+    service._read_cache = OrderedDict()
+    service._read_generation = 0
+    service._download_slots = asyncio.Semaphore(DatabaseService.STORAGE_DOWNLOAD_CONCURRENCY)
+    return service
+
+def test_large_body_is_offloaded_and_loaded_back(service, bucket):
+    body = "long document text"
+    document = {"content": body, "extracted_text": body}
+    key = asyncio.run(service._offload_content("agent-1", document))
+
+    assert key.startswith("agent-1/")
+    assert document == {"content": "", "extracted_text": "", "content_object_key": key}
+    assert bucket.objects[key] == body.encode("utf-8")
+
+    asyncio.run(service._load_offloaded_content([document]))
+    assert document["content"] == body
+    assert document["extracted_text"] == body
+
+def test_small_body_stays_inline(service, bucket):
+    document = {"content": "short", "extracted_text": "short"}
+    assert asyncio.run(service._offload_content("agent-1", document)) is None
+    assert document == {"content": "short", "extracted_text": "short"}
+    assert bucket.calls == []
+
+def test_missing_object_leaves_other_documents_loaded(service, bucket):
+    bucket.objects["agent-1/present.txt"] = b"present body"
+    rows = [
+        {"content": "", "extracted_text": "", "content_object_key": "agent-1/missing.txt"},
+        {"content": "", "extracted_text": "", "content_object_key": "agent-1/present.txt"},
+    ]
+    asyncio.run(service._load_offloaded_content(rows))
+    assert rows[0]["content"] == ""
+    assert rows[1]["content"] == "present body"
+
+def test_failed_insert_removes_uploaded_body(service, bucket, monkeypatch):
+    async def failing_insert(*args, **kwargs):
+        raise Exception("insert failed")
+    monkeypatch.setattr(service, "_insert_one", failing_insert)
+
+    class Document:
+        name = type = "notes.txt"
+        size = 100
+        content = extractedText = "long document text"
+        summary = None
+        metadata = None
+
+    with pytest.raises(Exception, match="insert failed"):
+        asyncio.run(service.create_agent_document("agent-1", Document()))
+    assert [call[0] for call in bucket.calls] == ["upload", "remove"]
+    assert bucket.objects == {}
+
+def test_stored_body_survives_failed_row_delete(service, bucket, monkeypatch):
+    bucket.objects["agent-1/doc.txt"] = b"body"
+
+    async def keys(query):
+        return ["agent-1/doc.txt"]
+    async def failing_delete(*args, **kwargs):
+        raise Exception("delete failed")
+    monkeypatch.setattr(service, "_offloaded_keys", keys)
+    monkeypatch.setattr(service, "_delete_by_id", failing_delete)
+
+    with pytest.raises(Exception, match="delete failed"):
+        asyncio.run(service.delete_agent_document("doc-1"))
+    assert "agent-1/doc.txt" in bucket.objects
+
+def test_stored_body_removed_after_row_delete(service, bucket, monkeypatch):
+    bucket.objects["agent-1/doc.txt"] = b"body"
+    order = []
+
+    async def keys(query):
+        return ["agent-1/doc.txt"]
+    async def delete(*args, **kwargs):
+        order.append("row")
+    monkeypatch.setattr(service, "_offloaded_keys", keys)
+    monkeypatch.setattr(service, "_delete_by_id", delete)
+
+    assert asyncio.run(service.delete_agent_document("doc-1")) is True
+    assert order == ["row"]
+    assert bucket.objects == {}
+
+def _fake_rows(monkeypatch, rows):
+    """Make every query in database_service return `rows`"""
+    class Result:
+        data = rows
+    async def fake_execute(query, attempts=3):
+        return Result()
+    monkeypatch.setattr("app.services.database_service.execute", fake_execute)
+
+def test_agent_listing_returns_keys_without_downloading(service, bucket, monkeypatch):
+    """/database/agents stays a small query: offloaded bodies come back as keys"""
+    bucket.objects["agent-1/doc.txt"] = b"stored body"
+    _fake_rows(monkeypatch, [{
+        "id": "agent-1",
+        "user_id": "user-1",
+        "agent_documents": [
+            {"id": "doc-1", "content": "", "extracted_text": "", "content_object_key": "agent-1/doc.txt"},
+            {"id": "doc-2", "content": "inline", "extracted_text": "inline", "content_object_key": None},
+        ],
+    }])
+
+    documents = asyncio.run(service.get_user_agents_bulk(["user-1"]))["user-1"][0]["agent_documents"]
+    assert [doc["content"] for doc in documents] == ["", "inline"]
+    assert documents[0]["content_object_key"] == "agent-1/doc.txt"
+    assert bucket.calls == []
+
+def test_document_listing_returns_keys_without_downloading(service, bucket, monkeypatch):
+    bucket.objects["agent-1/doc.txt"] = b"stored body"
+    _fake_rows(monkeypatch, [
+        {"id": "doc-1", "name": "a", "file_type": "txt", "file_size": 1, "uploaded_at": None,
+         "content": "", "summary": None, "extracted_text": "", "metadata": {}, "content_object_key": "agent-1/doc.txt"},
+    ])
+
+    documents = asyncio.run(service.get_agent_documents("agent-1"))
+    assert documents[0]["content"] == ""
+    assert documents[0]["contentObjectKey"] == "agent-1/doc.txt"
+    assert bucket.calls == []
+
+def test_single_document_loads_its_body(service, bucket, monkeypatch):
+    bucket.objects["agent-1/doc.txt"] = b"stored body"
+    _fake_rows(monkeypatch, [
+        {"id": "doc-1", "name": "a", "file_type": "txt", "file_size": 1, "uploaded_at": None,
+         "content": "", "summary": None, "extracted_text": "", "metadata": {}, "content_object_key": "agent-1/doc.txt"},
+    ])
+
+    document = asyncio.run(service.get_document_by_id("doc-1"))
+    assert document["content"] == "stored body"
+    assert document["extractedText"] == "stored body"
+    assert "contentObjectKey" not in document
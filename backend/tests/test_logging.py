@@ -0,0 +1,35 @@
+import logging
+import queue
+import orjson
+from app.core.logging_config import JsonFormatter, LocalQueueHandler
+
+def _queued_record(log):
+    """Log through a LocalQueueHandler and return what the listener would receive"""
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("tests.logging")
+    logger.propagate = False
+    logger.handlers = [LocalQueueHandler(log_queue)]
+    try:
+        log(logger)
+    finally:
+        logger.handlers = []
+    return log_queue.get_nowait()
+
+def test_json_keeps_traceback_out_of_message():
+    def log(logger):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed %s", "upload")
+
+    payload = orjson.loads(JsonFormatter().format(_queued_record(log)))
+    assert payload["message"] == "failed upload"
+    assert "Traceback" in payload["exc_info"]
+    assert "ValueError: boom" in payload["exc_info"]
+
+def test_json_keeps_extra_fields():
+    record = _queued_record(lambda logger: logger.warning("slow %d", 3, extra={"path": "/chat"}))
+    payload = orjson.loads(JsonFormatter().format(record))
+    assert payload["message"] == "slow 3"
+    assert payload["path"] == "/chat"
+    assert "exc_info" not in payload
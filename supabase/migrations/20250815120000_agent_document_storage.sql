@@ -0,0 +1,10 @@
+-- Keep large agent document bodies in Supabase Storage instead of the row
+-- (used when the backend runs with DOCUMENT_STORAGE_BUCKET=agent-docs)
+ALTER TABLE agent_documents
+ADD COLUMN IF NOT EXISTS content_object_key TEXT;
+
+-- Private bucket; only the backend's service role reads and writes it, after
+-- the agent_documents row has passed the caller's RLS checks
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('agent-docs', 'agent-docs', false)
+ON CONFLICT (id) DO NOTHING;